@@ -0,0 +1,428 @@
+# article_store.py
+
+import bisect
+import copy
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from http_client import get_session
+
+# Constants
+GIST_RAW_URL = "https://gist.githubusercontent.com/amightybeard/{gist_id}/raw/{file_name}"
+GIST_API_URL = "https://api.github.com/gists/{gist_id}"
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+# Blog articles use url/date_published, politics bills use bill_link/pub_date
+URL_FIELDS = ('url', 'bill_link')
+DATE_FIELDS = ('date_published', 'pub_date')
+# Records that are events on a page rather than the page itself: every
+# govtrack event on a bill links to the same bill, so they are told apart
+# by GUID only
+EVENT_URL_FIELDS = ('bill_link',)
+
+def canonical_url(url):
+    """
+    Normalize a URL so the same article always maps to the same string.
+    Lowercases scheme and host, drops the fragment, tracking parameters
+    and trailing slashes, and sorts the remaining query parameters.
+    """
+    parsed = urlparse(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params, urlencode(query), ''))
+
+def _first_field(article, fields):
+    for field in fields:
+        if article.get(field):
+            return article[field]
+    return None
+
+def article_url(article):
+    return _first_field(article, URL_FIELDS)
+
+def article_date(article):
+    return _first_field(article, DATE_FIELDS) or ''
+
+def _digest(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()[:16]
+
+def _is_event(article):
+    return bool(article.get("guid")) and any(article.get(field) for field in EVENT_URL_FIELDS)
+
+def article_keys(article):
+    """
+    Return the dedup keys of an article: its canonical URL and, when the
+    feed provided one, its GUID. Event records are keyed on their GUID alone.
+    """
+    keys = []
+    url = article_url(article)
+    if url and not _is_event(article):
+        keys.append("url:" + _digest(canonical_url(url)))
+    if article.get("guid"):
+        keys.append("guid:" + _digest(article["guid"]))
+    return keys
+
+def article_id(article):
+    """
+    Return the stable id of an article, the digest of its canonical URL
+    (of its GUID for event records).
+    """
+    if article.get("id"):
+        return article["id"]
+    url = article_url(article)
+    if url and not _is_event(article):
+        return _digest(canonical_url(url))
+    return _digest(article.get("guid") or url or "")
+
+def build_article_index(articles):
+    """
+    Build the set of dedup keys for a list of articles.
+    """
+    index = set()
+    for article in articles:
+        index.update(article_keys(article))
+    return index
+
+def merge_articles(existing_articles, new_articles, index=None):
+    """
+    Append the new articles that are not already known.
+    An article is a duplicate when its URL or GUID matches an existing
+    article or one added earlier in the same call.
+    Returns (merged_articles, added_articles).
+    """
+    if index is None:
+        index = build_article_index(existing_articles)
+    added = []
+    for article in new_articles:
+        keys = article_keys(article)
+        if any(key in index for key in keys):
+            continue
+        index.update(keys)
+        added.append(article)
+    return existing_articles + added, added
+
+# Sharded storage
+#
+# The article details live in one gist file per month, e.g.
+# dndblogs-article-details-2023-10.json, plus a small manifest
+# (dndblogs-article-details-manifest.json) that lists every shard with its
+# article and pending counts. Runs only read and write the shards they touch.
+# The dedup keys of every article added for a month, archived ones
+# included, are kept in a monthly index file
+# (dndblogs-article-details-index-2023-10.json). New articles are checked
+# against the index of their month and of the months on either side, so an
+# article is recognized when its date moved across a month boundary, and a
+# run reads only the index files of the months it adds to.
+# The manifest also keeps the pending queue: one [date, shard, id] entry per
+# unposted article, oldest first. Collectors insert into it and posters take
+# from its head, so finding the next article loads a single shard.
+# Posted articles older than the collectors' ARCHIVE_AFTER_DAYS are moved
+# out of the hot shards into yearly archive files
+# (dndblogs-article-details-archive-2023.json) that no regular run ever reads.
+
+# Files written during this run, by (gist_id, file_name). Raw gist URLs are
+# served through a CDN cache, so a file read back right after a PATCH can be
+# stale; reads of files this process wrote are answered from here instead.
+_written_files = {}
+
+def gist_headers(token):
+    return {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+
+def fetch_gist_file(gist_id, file_name, default=None):
+    """
+    Fetch and decode a JSON file from a gist.
+    Returns default when the file does not exist yet.
+    """
+    if (gist_id, file_name) in _written_files:
+        data = _written_files[(gist_id, file_name)]
+        return default if data is None else copy.deepcopy(data)
+    response = get_session().get(GIST_RAW_URL.format(gist_id=gist_id, file_name=file_name))
+    if response.status_code == 404:
+        return default
+    response.raise_for_status()
+    return response.json()
+
+def update_gist_files(gist_id, token, files):
+    """
+    Write several JSON files to a gist in a single PATCH.
+    A value of None deletes the file.
+    """
+    payload = {
+        "files": {
+            file_name: None if data is None else {"content": json.dumps(data, indent=4)}
+            for file_name, data in files.items()
+        }
+    }
+    response = get_session().patch(GIST_API_URL.format(gist_id=gist_id), headers=gist_headers(token), json=payload)
+    response.raise_for_status()
+    for file_name, data in files.items():
+        _written_files[(gist_id, file_name)] = copy.deepcopy(data)
+    return response
+
+def manifest_name(details_name):
+    return details_name.replace('.json', '-manifest.json')
+
+def index_name(details_name, month):
+    return details_name.replace('.json', f'-index-{month}.json')
+
+def shard_name(details_name, article):
+    """
+    Return the name of the monthly shard an article belongs to.
+    """
+    return details_name.replace('.json', f'-{article_month(article)}.json')
+
+def archive_name(details_name, article):
+    """
+    Return the name of the yearly archive file an article belongs to.
+    """
+    year = article_date(article)[:4] or 'undated'
+    return details_name.replace('.json', f'-archive-{year}.json')
+
+def shard_month(details_name, shard):
+    return shard[len(details_name) - len('.json') + 1:-len('.json')]
+
+def article_month(article):
+    return article_date(article)[:7] or 'undated'
+
+def neighbour_months(month):
+    """
+    Return the month with the ones before and after it.
+    """
+    if month == 'undated':
+        return [month]
+    year, number = int(month[:4]), int(month[5:7])
+    before = f"{year - 1}-12" if number == 1 else f"{year}-{number - 1:02d}"
+    after = f"{year + 1}-01" if number == 12 else f"{year}-{number + 1:02d}"
+    return [before, month, after]
+
+def queue_entry(shard, article):
+    return [article_date(article), shard, article_id(article)]
+
+def shard_stats(articles):
+    return {
+        "count": len(articles),
+        "pending": sum(1 for article in articles if not article["posted"])
+    }
+
+def migrate_legacy_details(gist_id, token, details_name):
+    """
+    Split the old single details file into monthly shards and write the
+    manifest and the monthly indexes. Duplicates in the old file are
+    dropped on the way. The old file is left in place untouched.
+    """
+    logging.info(f"No manifest found, migrating {details_name} to monthly shards...")
+    legacy_articles = fetch_gist_file(gist_id, details_name, default=[])
+    _, articles = merge_articles([], legacy_articles)
+    shards = {}
+    for article in articles:
+        shards.setdefault(shard_name(details_name, article), []).append(article)
+    manifest = {
+        "shards": {name: shard_stats(articles) for name, articles in shards.items()},
+        "queue": sorted(
+            queue_entry(name, article)
+            for name, articles in shards.items() for article in articles if not article["posted"]
+        )
+    }
+    files = dict(shards)
+    for shard, shard_articles in shards.items():
+        files[index_name(details_name, shard_month(details_name, shard))] = sorted(build_article_index(shard_articles))
+    files[manifest_name(details_name)] = manifest
+    update_gist_files(gist_id, token, files)
+    logging.info(f"Migrated {len(articles)} articles into {len(shards)} shards, "
+                 f"dropped {len(legacy_articles) - len(articles)} duplicates.")
+    return manifest
+
+def load_manifest(gist_id, token, details_name):
+    manifest = fetch_gist_file(gist_id, manifest_name(details_name))
+    if manifest is None:
+        manifest = migrate_legacy_details(gist_id, token, details_name)
+    if "queue" not in manifest:
+        manifest["queue"] = build_pending_queue(gist_id, manifest)
+    return manifest
+
+def build_pending_queue(gist_id, manifest):
+    """
+    Build the pending queue of a manifest written before the queue existed.
+    Only shards with pending articles are read. The queue is persisted with
+    the next manifest write.
+    """
+    queue = []
+    for shard, stats in manifest["shards"].items():
+        if stats["pending"]:
+            queue.extend(queue_entry(shard, article) for article in load_shard(gist_id, shard) if not article["posted"])
+    return sorted(queue)
+
+def load_shard(gist_id, shard):
+    return fetch_gist_file(gist_id, shard, default=[])
+
+def load_month_index(gist_id, details_name, manifest, month):
+    """
+    Return (keys, built) for the dedup keys of the articles of a month.
+    A month without an index file yet gets it built from its shard and
+    its articles in the yearly archive; built is True then, so the caller
+    persists it.
+    """
+    keys = fetch_gist_file(gist_id, index_name(details_name, month))
+    if keys is not None:
+        return set(keys), False
+    shard = details_name.replace('.json', f'-{month}.json')
+    year = month[:4] if month != 'undated' else month
+    archive = details_name.replace('.json', f'-archive-{year}.json')
+    articles = load_shard(gist_id, shard) if shard in manifest["shards"] else []
+    if archive in manifest.get("archives", {}):
+        articles += [article for article in fetch_gist_file(gist_id, archive, default=[]) if article_month(article) == month]
+    return build_article_index(articles), True
+
+def save_shards(gist_id, token, details_name, manifest, shards, indexes=None):
+    """
+    Write the given {shard: articles}, the refreshed manifest and, when
+    given, the {month: keys} dedup indexes in one PATCH.
+    """
+    files = {}
+    for month, keys in (indexes or {}).items():
+        files[index_name(details_name, month)] = sorted(keys)
+    for shard, articles in shards.items():
+        manifest["shards"][shard] = shard_stats(articles)
+        files[shard] = articles
+    files[manifest_name(details_name)] = manifest
+    return update_gist_files(gist_id, token, files)
+
+def next_pending_article(gist_id, manifest, loaded_shards=None):
+    """
+    Return (shard, articles, article) for the head of the pending queue,
+    or None when nothing is left to post. Queue entries whose article is
+    gone or already posted are dropped on the way.
+    loaded_shards caches shard contents across calls, so articles flagged
+    by an earlier call stay flagged.
+    """
+    if loaded_shards is None:
+        loaded_shards = {}
+    queue = manifest["queue"]
+    while queue:
+        _, shard, pending_id = queue[0]
+        if shard not in loaded_shards:
+            loaded_shards[shard] = load_shard(gist_id, shard)
+        articles = loaded_shards[shard]
+        for article in articles:
+            if not article["posted"] and article_id(article) == pending_id:
+                return shard, articles, article
+        logging.warning(f"Dropping stale queue entry {pending_id} from {shard}.")
+        queue.pop(0)
+    return None
+
+def mark_posted(manifest, shard, article):
+    """
+    Flag an article as posted and take it off the pending queue.
+    """
+    article["posted"] = True
+    entry = queue_entry(shard, article)
+    if entry in manifest["queue"]:
+        manifest["queue"].remove(entry)
+
+def add_articles(gist_id, token, details_name, new_articles):
+    """
+    Merge new articles into their monthly shards, dropping duplicates.
+    Duplicates are found through the monthly key indexes of each new
+    article's month and the months on either side, so an article already
+    stored in a neighbouring shard or in an archive is dropped too.
+    Only the shards that receive articles and those indexes are read.
+    Returns the list of articles actually added.
+    """
+    manifest = load_manifest(gist_id, token, details_name)
+
+    grouped = {}
+    for article in new_articles:
+        grouped.setdefault(shard_name(details_name, article), []).append(article)
+
+    indexes = {}
+    changed_months = set()
+    index = set()
+    for month in sorted({month for article in new_articles for month in neighbour_months(article_month(article))}):
+        indexes[month], built = load_month_index(gist_id, details_name, manifest, month)
+        if built and indexes[month]:
+            changed_months.add(month)
+        index.update(indexes[month])
+
+    shards = {}
+    added_articles = []
+    for shard, articles in grouped.items():
+        existing_articles = load_shard(gist_id, shard) if shard in manifest["shards"] else []
+        merged, added = merge_articles(existing_articles, articles, index)
+        if not added:
+            continue
+        merged.sort(key=article_date)
+        shards[shard] = merged
+        added_articles.extend(added)
+        month = shard_month(details_name, shard)
+        changed_months.add(month)
+        for article in added:
+            article["id"] = article_id(article)
+            indexes[month].update(article_keys(article))
+            if not article["posted"]:
+                bisect.insort(manifest["queue"], queue_entry(shard, article))
+
+    if shards:
+        save_shards(gist_id, token, details_name, manifest, shards,
+                    {month: indexes[month] for month in changed_months})
+    return added_articles
+
+def compact_shards(gist_id, token, details_name, max_age_days):
+    """
+    Move posted articles older than max_age_days from the hot shards into
+    the yearly archive files. Shards left empty are deleted.
+    Only shards old enough to hold such articles and with at least one
+    posted article are read. Everything is written in one PATCH.
+    Returns the number of articles archived.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=max_age_days)).strftime('%Y-%m-%d')
+    manifest = load_manifest(gist_id, token, details_name)
+
+    candidates = [
+        shard for shard, stats in manifest["shards"].items()
+        if stats["count"] > stats["pending"] and shard_month(details_name, shard) <= cutoff[:7]
+    ]
+    files = {}
+    archived = {}
+    for shard in sorted(candidates):
+        articles = load_shard(gist_id, shard)
+        keep = []
+        for article in articles:
+            if article["posted"] and article_date(article)[:10] < cutoff:
+                archived.setdefault(archive_name(details_name, article), []).append(article)
+            else:
+                keep.append(article)
+        if len(keep) == len(articles):
+            continue
+        if keep:
+            files[shard] = keep
+            manifest["shards"][shard] = shard_stats(keep)
+        else:
+            files[shard] = None
+            del manifest["shards"][shard]
+
+    if not archived:
+        return 0
+
+    archives = manifest.setdefault("archives", {})
+    for archive, articles in archived.items():
+        archive_articles = fetch_gist_file(gist_id, archive, default=[]) + articles
+        archive_articles.sort(key=article_date)
+        files[archive] = archive_articles
+        archives[archive] = len(archive_articles)
+    files[manifest_name(details_name)] = manifest
+    update_gist_files(gist_id, token, files)
+
+    total = sum(len(articles) for articles in archived.values())
+    logging.info(f"Archived {total} posted articles older than {max_age_days} days.")
+    return total
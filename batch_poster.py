@@ -0,0 +1,52 @@
+# batch_poster.py
+
+import logging
+import os
+import time
+
+from article_store import load_manifest, next_pending_article, mark_posted, save_shards
+
+# Constants
+POST_BATCH_SIZE = int(os.environ.get('POST_BATCH_SIZE', 1))  # Articles posted per run
+POST_INTERVAL = float(os.environ.get('POST_INTERVAL', 60))  # Seconds between two posts of a batch
+
+def post_pending_articles(gist_id, token, details_name, publish, batch_size=POST_BATCH_SIZE, interval=POST_INTERVAL):
+    """
+    Post up to batch_size articles from the head of the pending queue.
+
+    publish(article) posts a single article and raises on failure.
+    Posts are spaced by interval seconds. Every posted flag is written back
+    in a single gist PATCH at the end of the batch; if a post fails midway,
+    the articles posted before it are written first and the error is
+    re-raised.
+    Returns the list of posted articles.
+    """
+    logging.info("Fetching articles manifest...")
+    manifest = load_manifest(gist_id, token, details_name)
+    logging.info("Manifest fetched successfully.")
+
+    loaded_shards = {}
+    touched_shards = {}
+    posted = []
+    try:
+        while len(posted) < batch_size:
+            pending = next_pending_article(gist_id, manifest, loaded_shards)
+            if pending is None:
+                logging.info("No more unposted articles found.")
+                break
+            shard, articles, article = pending
+
+            if posted and interval:
+                time.sleep(interval)
+            publish(article)
+
+            # Update the article's "posted" status
+            mark_posted(manifest, shard, article)
+            touched_shards[shard] = articles
+            posted.append(article)
+    finally:
+        if touched_shards:
+            logging.info(f"Updating {details_name} shards to mark {len(posted)} articles as posted...")
+            save_shards(gist_id, token, details_name, manifest, touched_shards)
+            logging.info(f"{len(posted)} articles marked as posted successfully.")
+    return posted
@@ -0,0 +1,56 @@
+# bench_html_extract.py
+#
+# Times the html_extract backends over the saved article pages in
+# fixtures/pages and reports how closely each backend's extracted text
+# agrees with the BeautifulSoup backend. Backends whose libraries are not
+# installed are skipped.
+#
+#   python benchmarks/bench_html_extract.py
+
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from html_extract import BACKENDS
+from bench_summary_backend import word_overlap
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages', '*.html')
+BASELINE = 'bs'
+REPEAT = 5
+NUMBER = 20
+
+def main():
+    pages = []
+    for path in sorted(glob.glob(PAGES)):
+        with open(path, encoding='utf-8') as file:
+            pages.append(file.read())
+
+    results = {}
+    for backend, extract in BACKENDS.items():
+        try:
+            extracted = [extract(page) for page in pages]
+        except ImportError as e:
+            print(f"Skipping {backend}: {e}")
+            continue
+        timer = timeit.Timer(lambda: [extract(page) for page in pages])
+        per_page = min(timer.repeat(repeat=REPEAT, number=NUMBER)) / NUMBER / len(pages)
+        results[backend] = (per_page, extracted)
+
+    if BASELINE not in results:
+        print(f"The {BASELINE} backend is needed as the agreement baseline.")
+        return 1
+
+    reference = results[BASELINE][1]
+    print(f"{'backend':<13}{'ms/page':>9}{'speedup':>9}{'text overlap':>14}{'same title':>12}")
+    for backend, (per_page, extracted) in results.items():
+        overlaps = [word_overlap(content, ref[0]) for (content, _, _), ref in zip(extracted, reference)]
+        titles = sum(title == ref[1] for (_, title, _), ref in zip(extracted, reference))
+        print(f"{backend:<13}{per_page * 1e3:>9.2f}{results[BASELINE][0] / per_page:>8.2f}x"
+              f"{sum(overlaps) / len(overlaps):>14.3f}{titles:>8}/{len(pages)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# bench_summary_backend.py
+#
+# Compares the summarizer inference backends (SUMMARY_BACKEND) on the
+# articles in fixtures/articles.json: model load time, summary latency,
+# peak RSS and word overlap of each backend's summaries with fp32.
+# Each backend runs in its own process so peak RSS is measured separately.
+#
+#   python benchmarks/bench_summary_backend.py [backend ...]
+
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'articles.json')
+BASELINE = 'fp32'
+
+def run_backend(backend):
+    """
+    Summarize every fixture article with one backend, in this process,
+    and print the measurements as JSON on stdout.
+    """
+    os.environ['SUMMARY_BACKEND'] = backend
+    sys.path.insert(0, ROOT)
+    import dndblog_summarize_and_post as summarizer
+
+    with open(FIXTURE) as file:
+        articles = json.load(file)
+
+    start = time.perf_counter()
+    summarizer.load_model()
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    summaries = []
+    for article in articles:
+        start = time.perf_counter()
+        # Called directly rather than through get_summary to skip the summary cache
+        summaries.append(summarizer.generate_comprehensive_summary(article))
+        latencies.append(time.perf_counter() - start)
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    json.dump({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "peak_rss_mb": peak_rss_mb,
+        "summaries": summaries
+    }, sys.stdout)
+
+def word_overlap(summary, reference):
+    """
+    Unigram F1 between two summaries (ROUGE-1 without stemming).
+    """
+    words = re.findall(r"\w+", summary.lower())
+    reference_words = re.findall(r"\w+", reference.lower())
+    if not words or not reference_words:
+        return 0.0
+    counts = {}
+    for word in reference_words:
+        counts[word] = counts.get(word, 0) + 1
+    common = 0
+    for word in words:
+        if counts.get(word):
+            counts[word] -= 1
+            common += 1
+    if not common:
+        return 0.0
+    precision = common / len(words)
+    recall = common / len(reference_words)
+    return 2 * precision * recall / (precision + recall)
+
+def main(argv):
+    if argv[:1] == ['--backend']:
+        run_backend(argv[1])
+        return 0
+
+    backends = argv or [BASELINE, 'int8']
+    if BASELINE not in backends:
+        backends.insert(0, BASELINE)
+
+    results = {}
+    for backend in backends:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--backend', backend],
+                                stdout=subprocess.PIPE, check=True).stdout
+        results[backend] = json.loads(output)
+
+    reference = results[BASELINE]["summaries"]
+    print(f"{'backend':<10}{'load (s)':>10}{'mean (s)':>10}{'total (s)':>11}{'peak RSS (MB)':>15}{'overlap':>9}")
+    for backend in backends:
+        result = results[backend]
+        latencies = result["latencies"]
+        overlaps = [word_overlap(summary, ref) for summary, ref in zip(result["summaries"], reference)]
+        print(f"{backend:<10}{result['load_seconds']:>10.2f}{sum(latencies) / len(latencies):>10.2f}"
+              f"{sum(latencies):>11.2f}{result['peak_rss_mb']:>15.0f}{sum(overlaps) / len(overlaps):>9.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,58 @@
+# bench_text_normalize.py
+#
+# Compares the old five-pass description cleaning with text_normalize.normalize_text
+# over the feed descriptions in fixtures/descriptions.json.
+#
+#   python benchmarks/bench_text_normalize.py
+
+import html
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from text_normalize import normalize_text
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'descriptions.json')
+REPEAT = 5
+
+def legacy_clean_description(description):
+    """
+    The cleaning block the collectors used before text_normalize, followed
+    by the newline stripping the posters did on top of it.
+    """
+    description_cleaned = re.sub('<[^<]+?>', '', description)
+    description_cleaned = html.unescape(description_cleaned)
+    description_cleaned = description_cleaned.replace("&nbsp;", " ")
+    description_cleaned = re.sub(' +', ' ', description_cleaned)
+    description_cleaned = description_cleaned.strip()
+    return description_cleaned.replace("\n", " ").replace("\r", "").strip()
+
+def best_time(function, descriptions, number):
+    timer = timeit.Timer(lambda: [function(description) for description in descriptions])
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+def main():
+    with open(FIXTURE) as file:
+        descriptions = json.load(file)
+
+    mismatches = [
+        description for description in descriptions
+        if ' '.join(legacy_clean_description(description).split()) != normalize_text(description)
+    ]
+
+    short = [description for description in descriptions if len(description) < 5000]
+    large = [description for description in descriptions if len(description) >= 5000]
+    print(f"{'set':<8}{'items':>7}{'legacy (us)':>14}{'normalize (us)':>17}{'speedup':>10}")
+    for name, subset, number in (("short", short, 2000), ("large", large, 50)):
+        legacy = best_time(legacy_clean_description, subset, number) * 1e6
+        fast = best_time(normalize_text, subset, number) * 1e6
+        print(f"{name:<8}{len(subset):>7}{legacy:>14.1f}{fast:>17.1f}{legacy / fast:>9.2f}x")
+    print(f"Output mismatches (ignoring whitespace runs): {len(mismatches)}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# run.py
+#
+# Offline micro-benchmarks for the hot paths, run against the checked-in
+# fixtures. Results are written as JSON so runs from different versions
+# can be compared. A benchmark whose dependencies are not installed is
+# reported as skipped.
+#
+#   python benchmarks/run.py [--output results.json] [name ...]
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, '..')
+FIXTURES = os.path.join(BENCH_DIR, 'fixtures')
+REPEAT = 5
+
+# Score main points without a corpus IDF store, so results do not depend
+# on what the machine has collected
+SCRATCH_DIR = tempfile.mkdtemp(prefix='dndblogs-bench-')
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.environ['IDF_STORE_PATH'] = os.path.join(SCRATCH_DIR, 'missing.npz')
+
+sys.path.insert(0, ROOT)
+
+def read_fixture(*parts, mode='r'):
+    with open(os.path.join(FIXTURES, *parts), mode) as file:
+        return file.read()
+
+def feed_dates():
+    """
+    The date strings of the fixture feeds, in the formats blogs really use.
+    """
+    from feed_stream import iter_feed_entries
+
+    dates = []
+    for name in ('blog_rss.xml', 'blog_atom.xml'):
+        dates.extend(entry['published'] for entry in iter_feed_entries(read_fixture('feeds', name, mode='rb')))
+    return dates
+
+def bench_normalize_text():
+    from text_normalize import normalize_text
+
+    descriptions = json.loads(read_fixture('descriptions.json'))
+    return len(descriptions), lambda: [normalize_text(description) for description in descriptions]
+
+def bench_parse_date_to_datetime():
+    from feed_dates import parse_date_to_datetime
+
+    dates = feed_dates()
+    return len(dates), lambda: [parse_date_to_datetime(date) for date in dates]
+
+def bench_parse_date_to_iso():
+    from feed_dates import parse_date_to_iso
+
+    dates = feed_dates()
+    return len(dates), lambda: [parse_date_to_iso(date) for date in dates]
+
+def bench_parse_entry_date():
+    from feed_dates import parse_entry_date
+
+    entries = [{"published": date} for date in feed_dates()]
+
+    def run():
+        format_cache = {}
+        return [parse_entry_date(entry, format_cache) for entry in entries]
+    return len(entries), run
+
+def bench_iter_feed_entries():
+    from feed_stream import iter_feed_entries
+
+    feeds = [read_fixture('feeds', name, mode='rb') for name in ('blog_rss.xml', 'blog_atom.xml')]
+    return len(feeds), lambda: [list(iter_feed_entries(feed)) for feed in feeds]
+
+def bench_feedparser():
+    import feedparser
+
+    feeds = [read_fixture('feeds', name, mode='rb') for name in ('blog_rss.xml', 'blog_atom.xml')]
+    return len(feeds), lambda: [feedparser.parse(feed).entries for feed in feeds]
+
+def bench_fetch_rss_items():
+    from politics_rss_collection import fetch_rss_items
+
+    feed = read_fixture('feeds', 'govtrack_activity.xml', mode='rb')
+    return 1, lambda: list(fetch_rss_items(feed))
+
+def bench_parse_rss_item():
+    from politics_rss_collection import fetch_rss_items, parse_rss_item
+
+    items = list(fetch_rss_items(read_fixture('feeds', 'govtrack_activity.xml', mode='rb')))
+    return len(items), lambda: [parse_rss_item(item, 'Activity') for item in items]
+
+def extract_bench(backend):
+    def bench():
+        from html_extract import BACKENDS
+
+        # extract_content_with_bs minus the page download
+        pages = [read_fixture('pages', name) for name in sorted(os.listdir(os.path.join(FIXTURES, 'pages')))]
+        extract = BACKENDS[backend]
+        return len(pages), lambda: [extract(page) for page in pages]
+    return bench
+
+def bench_pack_chunks():
+    from transformers import BartTokenizer
+    from dndblog_summarize_and_post import MODEL_NAME, MODEL_CACHE_DIR, pack_chunks
+
+    # The tokenizer only, the model weights are not needed to pack chunks
+    tokenizer = BartTokenizer.from_pretrained(MODEL_NAME, cache_dir=MODEL_CACHE_DIR)
+    articles = json.loads(read_fixture('articles.json'))
+    return len(articles), lambda: [pack_chunks(article, tokenizer) for article in articles]
+
+def bench_rank_main_points():
+    import idf_store
+    from dndblog_summarize_and_post import rank_main_points
+
+    # get_main_points minus the summary cache, scoring only
+    store = idf_store.load_store()
+    articles = json.loads(read_fixture('articles.json'))
+    return len(articles), lambda: [rank_main_points(article, store) for article in articles]
+
+BENCHMARKS = {
+    "normalize_text": bench_normalize_text,
+    "parse_date_to_datetime": bench_parse_date_to_datetime,
+    "parse_date_to_iso": bench_parse_date_to_iso,
+    "parse_entry_date": bench_parse_entry_date,
+    "iter_feed_entries": bench_iter_feed_entries,
+    "feedparser.parse": bench_feedparser,
+    "fetch_rss_items": bench_fetch_rss_items,
+    "parse_rss_item": bench_parse_rss_item,
+    "extract_content[bs]": extract_bench('bs'),
+    "extract_content[lxml]": extract_bench('lxml'),
+    "extract_content[trafilatura]": extract_bench('trafilatura'),
+    "pack_chunks": bench_pack_chunks,
+    "rank_main_points": bench_rank_main_points
+}
+
+def measure(setup):
+    """
+    Time one benchmark. setup() returns (items, run) where run processes
+    items fixture items once. Reports the best of REPEAT timing loops.
+    """
+    items, run = setup()
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()  # Loops long enough to take at least 0.2s
+    best = min(timer.repeat(repeat=REPEAT, number=number)) / number
+    return {
+        "items": items,
+        "loops": number,
+        "seconds_per_call": best,
+        "seconds_per_item": best / items
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, check=True).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run the offline micro-benchmarks.")
+    parser.add_argument('names', nargs='*', help="benchmarks to run, all by default")
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        try:
+            results[name] = measure(BENCHMARKS[name])
+        except ImportError as e:
+            results[name] = {"skipped": str(e)}
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,97 @@
+# bill_cache.py
+
+import os
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+from article_store import fetch_gist_file, update_gist_files
+
+# Constants
+BILL_CACHE_FILE = 'politics-bill-cache.json'
+BILL_CACHE_MAX_AGE_DAYS = int(os.environ.get('BILL_CACHE_MAX_AGE_DAYS', 7))  # Rescrape entries older than this
+BILL_CACHE_KEEP_DAYS = 90  # Entries not refreshed for this long are dropped on save
+
+class BillCache(object):
+    """
+    Scraped bill details keyed by the bill's clean URL, persisted as a
+    file in the politics details gist.
+    Entries are reused until they are max_age_days old. Within a run,
+    threads asking for the same bill at the same time share one scrape.
+    """
+
+    def __init__(self, entries=None, max_age_days=BILL_CACHE_MAX_AGE_DAYS):
+        self.entries = entries if entries is not None else {}
+        self.max_age = timedelta(days=max_age_days)
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.hits = 0
+        self.scrapes = 0
+
+    @classmethod
+    def load(cls, gist_id, max_age_days=BILL_CACHE_MAX_AGE_DAYS):
+        return cls(fetch_gist_file(gist_id, BILL_CACHE_FILE, default={}), max_age_days)
+
+    def save(self, gist_id, token):
+        """
+        Write the cache back to the gist, dropping entries not refreshed
+        for BILL_CACHE_KEEP_DAYS. Nothing is written when nothing was scraped.
+        """
+        if not self.scrapes:
+            return
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=BILL_CACHE_KEEP_DAYS)).isoformat()
+        entries = {key: entry for key, entry in self.entries.items() if entry["scraped_at"] >= cutoff}
+        update_gist_files(gist_id, token, {BILL_CACHE_FILE: entries})
+        logging.info(f"Saved {len(entries)} bills to {BILL_CACHE_FILE} ({self.scrapes} scraped, {self.hits} reused).")
+
+    def _usable(self, entry, needs_summary):
+        if entry is None or (needs_summary and not entry["summary_scraped"]):
+            return False
+        return datetime.now(timezone.utc) - datetime.fromisoformat(entry["scraped_at"]) < self.max_age
+
+    def get(self, key, needs_summary, scrape):
+        """
+        Return the entry for key, calling scrape() for a fresh one only
+        when the cached entry is missing, expired or, if needs_summary,
+        was scraped without the summary. scrape returns
+        (bill_overview, bill_summary). A thread that finds the same key
+        already being scraped waits for that scrape instead of starting
+        its own. Exceptions from scrape() reach every waiting thread.
+        """
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if self._usable(entry, needs_summary):
+                    self.hits += 1
+                    return entry
+                future = self.in_flight.get(key)
+                owner = future is None
+                if owner:
+                    future = self.in_flight[key] = Future()
+            if not owner:
+                entry = future.result()
+                if not needs_summary or entry["summary_scraped"]:
+                    with self.lock:
+                        self.hits += 1
+                    return entry
+                continue  # The shared scrape skipped the summary, scrape again with it
+            try:
+                bill_overview, bill_summary = scrape()
+            except Exception as e:
+                with self.lock:
+                    del self.in_flight[key]
+                future.set_exception(e)
+                raise
+            entry = {
+                "bill_overview": bill_overview,
+                "bill_summary": bill_summary,
+                "summary_scraped": needs_summary,
+                "scraped_at": datetime.now(timezone.utc).isoformat()
+            }
+            with self.lock:
+                self.entries[key] = entry
+                self.scrapes += 1
+                del self.in_flight[key]
+            future.set_result(entry)
+            return entry
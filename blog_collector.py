@@ -0,0 +1,151 @@
+# blog_collector.py
+
+import os
+import logging
+from datetime import datetime, timezone
+
+from xml.etree.ElementTree import ParseError
+
+import feedparser
+
+from article_store import add_articles, compact_shards, fetch_gist_file, update_gist_files
+from feed_fetcher import FeedResult, fetch_feeds
+from feed_stream import iter_feed_entries
+from feed_watermark import scan_new_entries, advance_watermark, entry_guid
+from text_normalize import normalize_text
+
+# Constants
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+# Default parser for feeds, "feedparser" or "stream". A blog entry in the
+# tracker can override it with its own "parser" key.
+FEED_PARSER = os.environ.get('FEED_PARSER', 'feedparser')
+
+def parse_feed_entries(blog, content):
+    """
+    Yield the entries of a downloaded feed with the parser configured for the blog.
+    The streaming parser stops reading as soon as the caller stops
+    iterating. Feeds it cannot parse (it only accepts well-formed XML)
+    fall back to feedparser; entries already yielded come out again and
+    are dropped by the dedup on merge.
+    """
+    if blog.get("parser", FEED_PARSER) == "stream":
+        try:
+            yield from iter_feed_entries(content)
+            return
+        except ParseError as e:
+            logging.warning(f"Streaming parser failed for {blog['blog_name']} ({e}), falling back to feedparser.")
+    yield from feedparser.parse(content).entries
+
+def load_tracker(community):
+    logging.info(f"Fetching {community['tracker_file']}...")
+    rss_tracker_data = fetch_gist_file(community["tracker_gist_id"], community["tracker_file"])
+    logging.info("Tracker data fetched successfully.")
+    return rss_tracker_data
+
+def fetch_shared_feeds(trackers):
+    """
+    Fetch the feeds of several trackers, downloading each feed URL once.
+    Validators are only sent for a shared feed when every tracker listing
+    it agrees on them, otherwise a 304 could hide new entries from one of
+    them. Fresh validators are copied back to every listing blog entry.
+    Returns {rss_url: FeedResult}, with FeedResult.blog set to the first
+    listing blog entry.
+    """
+    blogs_by_url = {}
+    for rss_tracker_data in trackers:
+        for blog in rss_tracker_data["blogs"]:
+            blogs_by_url.setdefault(blog["rss_url"], []).append(blog)
+
+    fetch_blogs = []
+    for rss_url, blogs in blogs_by_url.items():
+        fetch_blog = {"blog_name": blogs[0]["blog_name"], "rss_url": rss_url}
+        validators = {(blog.get("etag"), blog.get("last_modified")) for blog in blogs}
+        if len(validators) == 1:
+            etag, last_modified = validators.pop()
+            if etag:
+                fetch_blog["etag"] = etag
+            if last_modified:
+                fetch_blog["last_modified"] = last_modified
+        fetch_blogs.append(fetch_blog)
+
+    feed_results = {}
+    for fetch_blog, content, error, not_modified in fetch_feeds(fetch_blogs):
+        blogs = blogs_by_url[fetch_blog["rss_url"]]
+        if content is not None:
+            for blog in blogs:
+                for key in ("etag", "last_modified"):
+                    if key in fetch_blog:
+                        blog[key] = fetch_blog[key]
+                    else:
+                        blog.pop(key, None)
+        feed_results[fetch_blog["rss_url"]] = FeedResult(blogs[0], content, error, not_modified)
+    return feed_results
+
+def collect_new_articles(rss_tracker_data, feed_results):
+    """
+    Parse the fetched feeds of a tracker and return the entries newer than
+    each blog's watermark, advancing the watermarks as it goes.
+    """
+    last_fetched_date = datetime.strptime(rss_tracker_data["last_fetched"], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    new_articles = []
+    not_modified = 0
+
+    logging.info("Starting RSS feed parsing...")
+    for blog in rss_tracker_data["blogs"]:
+        _, content, error, unchanged = feed_results[blog["rss_url"]]
+        if unchanged:
+            not_modified += 1
+            continue  # Feed has not changed since the last run
+        if content is None:
+            continue  # Fetch failed, already logged
+        entries = parse_feed_entries(blog, content)
+        for entry, article_date in scan_new_entries(entries, blog.get("watermark"), last_fetched_date):
+            new_articles.append({
+                "blog_name": blog["blog_name"],
+                "url": entry.get("link"),
+                "guid": entry_guid(entry),
+                "title": entry.get("title", ""),
+                "description": normalize_text(entry.get("description", "")),
+                "date_published": article_date.isoformat(),
+                "posted": False
+            })
+            advance_watermark(blog, entry, article_date)
+        entries.close()  # Stop the streaming parser when the scan ended early
+    logging.info(f"RSS feed parsing completed. Found {len(new_articles)} new articles, {not_modified} feeds unchanged.")
+    return new_articles
+
+def collect_community(community, rss_tracker_data=None, feed_results=None):
+    """
+    Run the RSS collection of one community: fetch its feeds (unless
+    feed_results is given), add the new articles to its details shards,
+    archive old posted articles and save the tracker.
+    Returns the list of articles added.
+    """
+    if rss_tracker_data is None:
+        rss_tracker_data = load_tracker(community)
+    if feed_results is None:
+        logging.info("Fetching RSS feeds...")
+        feed_results = fetch_shared_feeds([rss_tracker_data])
+        logging.info("RSS feeds fetched.")
+
+    new_articles = collect_new_articles(rss_tracker_data, feed_results)
+
+    # Merge new articles into their monthly shards
+    details_file = community["details_file"]
+    logging.info(f"Adding new articles to the {details_file} shards...")
+    added_articles = add_articles(community["details_gist_id"], community["gist_token"], details_file, new_articles)
+    logging.info(f"Added {len(added_articles)} articles, dropped {len(new_articles) - len(added_articles)} duplicates.")
+
+    # Move old posted articles out of the hot shards
+    logging.info(f"Compacting {details_file} shards...")
+    archived_count = compact_shards(community["details_gist_id"], community["gist_token"], details_file, ARCHIVE_AFTER_DAYS)
+    logging.info(f"Compaction completed. {archived_count} articles archived.")
+
+    # Update the last fetched date, watermarks and validators
+    logging.info(f"Updating last fetched date in {community['tracker_file']}...")
+    rss_tracker_data["last_fetched"] = datetime.now().strftime('%Y-%m-%d')
+    update_gist_files(community["tracker_gist_id"], community["gist_token"], {community["tracker_file"]: rss_tracker_data})
+    logging.info("Last fetched date updated successfully.")
+
+    logging.info(f"{community['name']} collection completed. {len(added_articles)} new articles added.")
+    return added_articles
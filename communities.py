@@ -0,0 +1,92 @@
+# communities.py
+
+import os
+
+from text_normalize import collapse_whitespace
+
+# Post templates
+
+BOT_FOOTER = "I'm a bot. Post feedback, blog inclusion requests, and suggestions to /s/ModBot. [Read the announcement post]({announcement_url})."
+
+def clean_post_description(article):
+    return collapse_whitespace(article.get("description", ""))  # Cleaning up newlines and spaces
+
+def format_blog_post(article, title_prefix, announcement_url):
+    post_title = f"{title_prefix} {article['title']}"
+    post_content = f"""[Read full post by {article['blog_name']}]({article['url']})
+
+-----
+
+{clean_post_description(article)}
+
+-----
+
+{BOT_FOOTER.format(announcement_url=announcement_url)}"""
+    return post_title, post_content
+
+def format_dnd_post(article):
+    return format_blog_post(article, "[Blog]", "https://squabblr.co/u/modbot/post/8n061My7wB")
+
+def format_nfl_post(article):
+    return format_blog_post(article, f"[{article['blog_name']}]", "https://squabblr.co/u/modbot/post/G8wA45APxz")
+
+def format_science_post(article):
+    return f"{article['title']}", f"""{article['url']}"""
+
+def format_politics_post(article):
+    # Politics records are govtrack events: bill_title, bill_link, bill_description
+    return f"{article['bill_title']}", f"""{article['bill_link']}
+
+{collapse_whitespace(article.get("bill_description") or "")}"""
+
+# Community settings
+#
+# tracker_file is None for communities that are not collected from blog feeds.
+# post_every_hours is how often the shared posting workflow posts there.
+
+COMMUNITIES = {
+    "dnd": {
+        "name": "dnd",
+        "gist_token": os.environ.get('DNDBLOGS_GIST_TOKEN'),
+        "squabblr_token": os.environ.get('DNDBLOGS_SQUABBLR_TOKEN'),
+        "tracker_gist_id": os.environ.get('DNDBLOGS_GIST_TRACKER'),
+        "details_gist_id": os.environ.get('DNDBLOGS_GIST_DETAILS'),
+        "tracker_file": 'dndblogs-rss-tracker.json',
+        "details_file": 'dndblogs-article-details.json',
+        "format_post": format_dnd_post,
+        "post_every_hours": 5
+    },
+    "nfl": {
+        "name": "nfl",
+        "gist_token": os.environ.get('NFLBLOGS_GIST_TOKEN'),
+        "squabblr_token": os.environ.get('NFLBLOGS_SQUABBLR_TOKEN'),
+        "tracker_gist_id": os.environ.get('NFLBLOGS_GIST_TRACKER'),
+        "details_gist_id": os.environ.get('NFLBLOGS_GIST_DETAILS'),
+        "tracker_file": 'nflblogs-rss-tracker.json',
+        "details_file": 'nflblogs-article-details.json',
+        "format_post": format_nfl_post,
+        "post_every_hours": 4
+    },
+    "science": {
+        "name": "science",
+        "gist_token": os.environ.get('DNDBLOGS_GIST_TOKEN'),
+        "squabblr_token": os.environ.get('DJ_SQUABBLR_TOKEN'),
+        "tracker_gist_id": 'b20b9a2e4d53a0db1be222f66dd266f7',
+        "details_gist_id": 'f479054c7adb2c01edf69e03c30cce64',
+        "tracker_file": 'science-rss-tracker.json',
+        "details_file": 'science-article-details.json',
+        "format_post": format_science_post,
+        "post_every_hours": 3
+    },
+    "politics": {
+        "name": "politics",
+        "gist_token": os.environ.get('DNDBLOGS_GIST_TOKEN'),
+        "squabblr_token": os.environ.get('POL_SQUABBLR_TOKEN'),
+        "tracker_gist_id": None,
+        "details_gist_id": '6c90a5d9642610efdbf83840dfc0fb76',
+        "tracker_file": None,
+        "details_file": 'politics-article-details.json',
+        "format_post": format_politics_post,
+        "post_every_hours": 2
+    }
+}
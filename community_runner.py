@@ -0,0 +1,105 @@
+# community_runner.py
+#
+# Runs the RSS collection or the posting of several communities in one process.
+#
+#   python community_runner.py collect [community ...]
+#   python community_runner.py post [community ...]
+#
+# Without community names every configured community is processed. Posting
+# only runs for communities whose post_every_hours divides the current hour,
+# unless --force is given.
+
+import logging
+import sys
+from datetime import datetime, timezone
+
+from batch_poster import post_pending_articles
+from blog_collector import collect_community, fetch_shared_feeds, load_tracker
+from communities import COMMUNITIES
+from squabblr import post_to_squabblr
+
+logging.basicConfig(level=logging.INFO)
+
+def post_community(community):
+    """
+    Post the next pending articles of one community.
+    Returns the list of posted articles.
+    """
+    def publish(article):
+        post_title, post_content = community["format_post"](article)
+        post_to_squabblr(community["name"], community["squabblr_token"], post_title, post_content)
+
+    posted = post_pending_articles(community["details_gist_id"], community["gist_token"], community["details_file"], publish)
+    logging.info(f"{community['name']} posting completed. {len(posted)} articles posted.")
+    return posted
+
+def collect_all(communities):
+    """
+    Collect every community, fetching each feed URL only once even when
+    several trackers list it.
+    Returns the names of the communities that failed.
+    """
+    communities = [community for community in communities if community["tracker_file"]]
+    failed = []
+    trackers = {}
+    for community in communities:
+        try:
+            trackers[community["name"]] = load_tracker(community)
+        except Exception as e:
+            logging.exception(f"Failed to load the {community['name']} tracker: {e}")
+            failed.append(community["name"])
+
+    logging.info("Fetching RSS feeds...")
+    feed_results = fetch_shared_feeds(list(trackers.values()))
+    logging.info(f"RSS feeds fetched. {len(feed_results)} distinct feeds.")
+
+    for community in communities:
+        if community["name"] not in trackers:
+            continue
+        try:
+            collect_community(community, trackers[community["name"]], feed_results)
+        except Exception as e:
+            logging.exception(f"{community['name']} collection failed: {e}")
+            failed.append(community["name"])
+    return failed
+
+def post_all(communities, force=False):
+    """
+    Post for every community that is due this hour.
+    Returns the names of the communities that failed.
+    """
+    hour = datetime.now(timezone.utc).hour
+    failed = []
+    for community in communities:
+        if not force and hour % community["post_every_hours"]:
+            logging.info(f"{community['name']} is not due for posting this hour.")
+            continue
+        try:
+            post_community(community)
+        except Exception as e:
+            logging.exception(f"{community['name']} posting failed: {e}")
+            failed.append(community["name"])
+    return failed
+
+def main(argv):
+    force = "--force" in argv
+    args = [arg for arg in argv if arg != "--force"]
+    if not args or args[0] not in ("collect", "post"):
+        print("Usage: python community_runner.py collect|post [--force] [community ...]")
+        return 2
+
+    names = args[1:] or list(COMMUNITIES)
+    communities = [COMMUNITIES[name] for name in names]
+    if args[0] == "collect":
+        failed = collect_all(communities)
+    else:
+        failed = post_all(communities, force)
+
+    if failed:
+        logging.error(f"Bot completed with failures: {', '.join(failed)}")
+        return 1
+    logging.info("Bot completed.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
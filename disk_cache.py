@@ -0,0 +1,108 @@
+# disk_cache.py
+#
+# Size bookkeeping shared by the on-disk caches (summary_cache, http_cache).
+
+import os
+import logging
+import threading
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+def file_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+def write_atomic(path, data):
+    """
+    Write bytes to path through a temporary file, so readers never see a
+    half-written entry. Returns by how many bytes the file grew.
+    Raises OSError when the write fails.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    old_size = file_size(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return file_size(path) - old_size
+
+def evict(cache_dir, max_bytes, suffix):
+    """
+    Delete the least recently used entries (files ending in suffix) until
+    the cache fits in max_bytes.
+    Returns the number of bytes left in the cache.
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        deleted += 1
+    if deleted:
+        logging.info(f"Evicted {deleted} entries from {cache_dir}.")
+    return total
+
+class CacheSize(object):
+    """
+    A running byte count of a cache directory. The directory is walked
+    once, the first time the count is needed, and again only to evict
+    when writes push the count past max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes, suffix):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.total = None
+        self.lock = threading.Lock()
+
+    def add(self, delta):
+        """
+        Record that an entry write changed the cache size by delta bytes,
+        evicting the least recently used entries if it is now too big.
+        """
+        with self.lock:
+            if self.total is None:
+                self.total = evict(self.cache_dir, self.max_bytes, self.suffix)
+                return
+            self.total += delta
+            if self.total > self.max_bytes:
+                self.total = evict(self.cache_dir, self.max_bytes, self.suffix)
+
+def cache_size(cache_dir, max_bytes, suffix):
+    """
+    Return the process-wide CacheSize of cache_dir.
+    """
+    with _trackers_lock:
+        key = (cache_dir, max_bytes, suffix)
+        if key not in _trackers:
+            _trackers[key] = CacheSize(cache_dir, max_bytes, suffix)
+        return _trackers[key]
@@ -1,16 +1,17 @@
-import requests
 import os
 import json
 import logging
 import io
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from transformers import BartForConditionalGeneration, BartTokenizer
 from datetime import datetime
 import re
 from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
 import xml.etree.ElementTree as ET
+from http_client import get_session
+from html_extract import extract_content
+from http_cache import cached_get
+from summary_cache import cache_key, get_cached, set_cached
+import idf_store
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -29,10 +30,48 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-# Initialize BART model and tokenizer
+# BART model and tokenizer, loaded by load_model() on first use
 MODEL_NAME = "facebook/bart-large-cnn"
-MODEL = BartForConditionalGeneration.from_pretrained(MODEL_NAME)
-TOKENIZER = BartTokenizer.from_pretrained(MODEL_NAME)
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'dndblogs-models'))
+# Inference backend: "fp32" runs the model as published, "int8" quantizes its
+# linear layers dynamically, which is faster and smaller on CPU-only runners
+SUMMARY_BACKEND = os.environ.get('SUMMARY_BACKEND', 'fp32')
+SUMMARY_BACKENDS = ('fp32', 'int8')
+MODEL = None
+TOKENIZER = None
+SUMMARY_BATCH_SIZE = int(os.environ.get('SUMMARY_BATCH_SIZE', 4))  # Chunks per generate call
+MAX_INPUT_TOKENS = 1024  # bart-large-cnn encoder limit
+SUMMARY_PROMPT = "summarize: "
+GENERATION_PARAMS = {"min_length": 50, "length_penalty": 5.0, "num_beams": 2, "early_stopping": True}
+
+def load_model():
+    """
+    Load the BART model and tokenizer the first time they are needed, so
+    runs with nothing to summarize never import transformers or touch
+    the weights.
+    Weights come from the safetensors files in MODEL_CACHE_DIR, which are
+    memory-mapped, and low_cpu_mem_usage loads them straight into the
+    model instead of building a randomly initialized copy first.
+    With SUMMARY_BACKEND set to "int8" the linear layers are then
+    replaced by dynamically quantized ones.
+    """
+    global MODEL, TOKENIZER
+    if MODEL is None:
+        if SUMMARY_BACKEND not in SUMMARY_BACKENDS:
+            raise ValueError(f"Unknown SUMMARY_BACKEND {SUMMARY_BACKEND!r}, expected one of {SUMMARY_BACKENDS}")
+        from transformers import BartForConditionalGeneration, BartTokenizer
+
+        logging.info(f"Loading {MODEL_NAME} from {MODEL_CACHE_DIR}...")
+        TOKENIZER = BartTokenizer.from_pretrained(MODEL_NAME, cache_dir=MODEL_CACHE_DIR)
+        MODEL = BartForConditionalGeneration.from_pretrained(
+            MODEL_NAME, cache_dir=MODEL_CACHE_DIR, use_safetensors=True, low_cpu_mem_usage=True)
+        MODEL.eval()
+        if SUMMARY_BACKEND == 'int8':
+            import torch
+
+            MODEL = torch.quantization.quantize_dynamic(MODEL, {torch.nn.Linear}, dtype=torch.qint8)
+        logging.info(f"Model loaded ({SUMMARY_BACKEND}).")
+    return MODEL, TOKENIZER
 
 def fetch_gist_data(gist_id, token):
     headers = {
@@ -40,7 +79,7 @@ def fetch_gist_data(gist_id, token):
         "Accept": "application/vnd.github.v3+json"
     }
     gist_url = f"https://api.github.com/gists/{GIST_ID_TRACKER}"
-    response = requests.get(gist_url, headers=headers)
+    response = get_session().get(gist_url, headers=headers)
     response.raise_for_status()
     gist_content = list(response.json()["files"].values())[0]["content"]
     return json.loads(gist_content)
@@ -64,7 +103,7 @@ def mark_article_as_posted(url, gist_id, token):
             }
         }
     }
-    response = requests.patch(gist_url, headers=headers, json=data)
+    response = get_session().patch(gist_url, headers=headers, json=data)
     response.raise_for_status()
     return response.status_code
 
@@ -84,9 +123,9 @@ def split_into_sentences(text):
     # Use regular expression to split sentences by common punctuation used at the end of sentences
     return re.split(r'(?<=[.!?])\s+', text)
     
-def extract_content_with_bs(url):
+def extract_content_with_bs(url, backend=None):
     """
-    Extracts main content of an article using BeautifulSoup
+    Extracts main content of an article using the configured html_extract backend
     """
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
@@ -95,79 +134,126 @@ def extract_content_with_bs(url):
     # Log the initiation of the request
     logging.info(f"Initiating request to URL: {url}")
     
-    response = requests.get(url, headers=headers)
+    response = cached_get(url, headers=headers)
     
     # Log the response status code
-    logging.info(f"Received response with status code: {response.status_code}")
+    logging.info(f"Received response with status code: {response.status_code}{' (cached)' if response.from_cache else ''}")
 
-    # Start parsing with BeautifulSoup
     logging.info(f"Starting content extraction for URL: {url}")
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    # Remove header and footer content
-    for header in soup.find_all('header'):
-        header.decompose()
-    for footer in soup.find_all('footer'):
-        footer.decompose()
+    full_content, title, meta_description = extract_content(response.text, backend)
 
-    # Extract title
-    title_tag = soup.find('title')
-    title = title_tag.text if title_tag else ''
-    
     # Log if the title was found or not
     if title:
         logging.info(f"Title found for URL: {url} - '{title}'")
     else:
         logging.warning(f"No title found for URL: {url}")
 
-    # Extract meta description
-    meta_description = ""
-    meta_tag = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
-    if meta_tag:
-        meta_description = meta_tag.attrs.get("content", "")
-
-    # Extract main content based on common tags used for main article content
-    content_tags = ['p']
-    content_elements = soup.find_all(content_tags)
-    
-    # Extract text from each content element and filter out short or irrelevant content
-    content = [el.text for el in content_elements if len(el.text.split()) > 5 and title not in el.text]
-    
-    # Log the number of paragraphs/content tags found
-    logging.info(f"Found {len(content)} paragraphs/content tags for URL: {url}")
-
-    # Join content and return
-    full_content = '\n'.join(content)
-
-    logging.info(f"Found {len(content)} paragraphs/content tags for URL: {url}")
     logging.info(f"Content snippet for URL: {url} - '{full_content[:100]}...'")
 
     return full_content, title, meta_description
 
-def split_into_chunks(text, chunk_size=5):
+def _slice_to_budget(ids, tokenizer, budget):
     """
-    Split the content into chunks of given size.
+    Decode token ids back to text in pieces of at most budget tokens.
+    Decoding and re-tokenizing does not always give the same tokens back,
+    so each piece is re-tokenized and shortened until it really fits.
+    Returns a list of (piece, token_count).
     """
-    paragraphs = text.split('\n')
-    chunks = [paragraphs[i:i+chunk_size] for i in range(0, len(paragraphs), chunk_size)]
-    return ['\n'.join(chunk) for chunk in chunks]
-
-def generate_summary(text, max_length=150):
-    # Ensure the MODEL and TOKENIZER are available
-    global MODEL, TOKENIZER
-    
-    inputs = TOKENIZER.encode("summarize: " + text, return_tensors="pt", max_length=1024, truncation=True)
-    outputs = MODEL.generate(inputs, max_length=max_length, min_length=50, length_penalty=5.0, num_beams=2, early_stopping=True)
-    summary = TOKENIZER.decode(outputs[0], skip_special_tokens=True)
-    
-    return summary
+    pieces = []
+    start = 0
+    while start < len(ids):
+        end = min(len(ids), start + budget)
+        while True:
+            piece = tokenizer.decode(ids[start:end])
+            length = len(tokenizer(piece, add_special_tokens=False)["input_ids"])
+            if length <= budget or end - start == 1:
+                break
+            end = max(start + 1, end - (length - budget))
+        pieces.append((piece, length))
+        start = end
+    return pieces
+
+def _split_to_budget(text, tokenizer, budget):
+    """
+    Split a paragraph longer than budget tokens into pieces that fit,
+    at sentence boundaries where possible and at token boundaries for
+    sentences that are too long on their own.
+    Returns a list of (piece, token_count).
+    """
+    pieces = []
+    for sentence in split_into_sentences(text):
+        ids = tokenizer(sentence, add_special_tokens=False)["input_ids"]
+        if len(ids) <= budget:
+            pieces.append((sentence, len(ids)))
+        else:
+            pieces.extend(_slice_to_budget(ids, tokenizer, budget))
+    return pieces
+
+def pack_chunks(text, tokenizer, max_tokens=MAX_INPUT_TOKENS):
+    """
+    Split the content into as few chunks as possible that each fit the
+    model input once the prompt and special tokens are added.
+    Whole paragraphs are packed in order until the next one would go over
+    the budget; a paragraph that does not fit in an empty chunk is split
+    by sentence, so no text is ever truncated by the tokenizer.
+    """
+    budget = max_tokens - len(tokenizer(SUMMARY_PROMPT)["input_ids"])
+    separator = len(tokenizer('\n', add_special_tokens=False)["input_ids"])
+    paragraphs = [paragraph for paragraph in text.split('\n') if paragraph.strip()]
+    if not paragraphs:
+        return []
+
+    pieces = []
+    for paragraph, ids in zip(paragraphs, tokenizer(paragraphs, add_special_tokens=False)["input_ids"]):
+        if len(ids) <= budget:
+            pieces.append((paragraph, len(ids)))
+        else:
+            pieces.extend(_split_to_budget(paragraph, tokenizer, budget))
+
+    chunks = []
+    current = []
+    used = 0
+    for piece, length in pieces:
+        needed = length + (separator if current else 0)
+        if current and used + needed > budget:
+            chunks.append('\n'.join(current))
+            current = []
+            used = 0
+            needed = length
+        current.append(piece)
+        used += needed
+    chunks.append('\n'.join(current))
+    return chunks
+
+def generate_summaries(texts, max_length=150, batch_size=SUMMARY_BATCH_SIZE):
+    """
+    Summarize several texts, batch_size of them per generate call.
+    Texts are sorted by length before batching so each padded batch holds
+    inputs of similar size; the attention mask keeps the padding out of
+    the result, so each summary matches what a batch of one would give.
+    Summaries are returned in the order of texts.
+    """
+    model, tokenizer = load_model()
+
+    prompts = [SUMMARY_PROMPT + text for text in texts]
+    order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+    summaries = [None] * len(prompts)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        inputs = tokenizer([prompts[i] for i in batch], return_tensors="pt", max_length=MAX_INPUT_TOKENS, truncation=True, padding=True)
+        outputs = model.generate(inputs["input_ids"], attention_mask=inputs["attention_mask"], max_length=max_length, **GENERATION_PARAMS)
+        for i, output in zip(batch, outputs):
+            summaries[i] = tokenizer.decode(output, skip_special_tokens=True)
+    return summaries
 
 def generate_comprehensive_summary(content):
     """
-    Generate a summary by splitting the content into chunks and summarizing each chunk.
+    Generate a summary by packing the content into chunks that fit the
+    model input and summarizing the chunks in batches.
     """
-    chunks = split_into_chunks(content)
-    summaries = [generate_summary(chunk) for chunk in chunks]
+    _, tokenizer = load_model()
+    chunks = pack_chunks(content, tokenizer)
+    summaries = generate_summaries(chunks)
     
     # Combine the summaries
     combined_summary = ' '.join(summaries)
@@ -200,9 +286,16 @@ def get_summary(article):
             logging.error(f"No valid content provided.")
             return None
 
-        # Generate a comprehensive summary by handling the text in chunks.
-        summary = generate_comprehensive_summary(article)
-        logging.info(f"Summary generated.")
+        # Generate a comprehensive summary by handling the text in chunks,
+        # unless this exact text was already summarized with these settings
+        key = cache_key("summary", article, {"model": MODEL_NAME, "backend": SUMMARY_BACKEND, "chunking": "tokens", "max_length": 150, **GENERATION_PARAMS})
+        summary = get_cached(key)
+        if summary is None:
+            summary = generate_comprehensive_summary(article)
+            set_cached(key, summary)
+            logging.info(f"Summary generated.")
+        else:
+            logging.info(f"Summary loaded from cache.")
 
         # Extract main points
         main_points = get_main_points(article)
@@ -219,31 +312,52 @@ def get_summary(article):
 def get_main_points(text, num_points=5):
     """
     Extracts the main points from the given text using TF-IDF ranking.
+    Sentences are hashed into the same feature space as the corpus IDF
+    store (see idf_store.py), so scoring is one sparse transform. Without
+    a store the article's own sentences stand in for the corpus.
+    """
+    # The store's article count is part of the key, so cached points are
+    # recomputed once idf_store.py has added articles to it
+    store = idf_store.load_store()
+    key = cache_key("main_points", text, {"num_points": num_points, "idf": "hashed", "ngram_range": list(idf_store.NGRAM_RANGE), "idf_docs": store["n_docs"]})
+    main_points = get_cached(key)
+    if main_points is None:
+        main_points = rank_main_points(text, store, num_points)
+        set_cached(key, main_points)
+    return main_points
+
+def rank_main_points(text, store, num_points=5):
+    """
+    Rank the sentences of text by TF-IDF score against the given IDF
+    store and return the top num_points, without going through the cache.
     """
     # Tokenize the article into sentences
     sentences = split_into_sentences(text)
     
-    # Use TF-IDF to rank sentences with tweaked parameters
-    tfidf_vectorizer = TfidfVectorizer(stop_words='english', max_df=0.9, min_df=3, ngram_range=(1,2))
-    tfidf_matrix = tfidf_vectorizer.fit_transform(sentences)
+    # Weight the hashed term counts by the corpus IDF and L2-normalize each sentence
+    from sklearn.preprocessing import normalize  # Imported here to keep startup fast
+    counts = idf_store.hashing_vectorizer().transform(sentences)
+    if store["n_docs"]:
+        idf = idf_store.idf_weights(store["df"], store["n_docs"])
+    else:
+        idf = idf_store.idf_weights(idf_store.document_frequencies(counts), len(sentences), min_df=1)
+    tfidf_matrix = normalize(counts.multiply(idf).tocsr())
     
     # Sum the TF-IDF scores for each sentence to get an overall score for the sentence
-    sentence_scores = tfidf_matrix.sum(axis=1).tolist()
+    sentence_scores = tfidf_matrix.sum(axis=1).A1.tolist()
     
     # Rank sentences based on their scores
     ranked_sentences = [sentences[idx] for idx, score in sorted(enumerate(sentence_scores), key=lambda x: x[1], reverse=True)]
     
     # Extract top n sentences as main points
-    main_points = ranked_sentences[:num_points]
-
-    return main_points
+    return ranked_sentences[:num_points]
 
 def post_article(post_id, content):
     headers = {
         'authorization': 'Bearer ' + SQUABBLES_TOKEN
     }
     
-    resp = requests.post('https://squabblr.co/api/new-post', data={
+    resp = get_session().post('https://squabblr.co/api/new-post', data={
         "community_name": "test",
         "title": title,
         "content": content
@@ -0,0 +1,84 @@
+# feed_dates.py
+
+from datetime import datetime, timezone
+
+from dateutil import parser
+
+# Formats tried before falling back to dateutil, most common first
+STRICT_FORMATS = (
+    '%a, %d %b %Y %H:%M:%S %z',  # RFC 822, numeric offset
+    '%a, %d %b %Y %H:%M:%S GMT',  # RFC 822, GMT
+    '%Y-%m-%dT%H:%M:%S%z',  # ISO 8601
+    '%Y-%m-%dT%H:%M:%S.%f%z',  # ISO 8601 with fractions
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d'
+)
+
+def parse_date_to_datetime(date_str):
+    """
+    Parse a date string using dateutil's parser.
+    If the datetime is offset-naive, default to UTC.
+    Returns a datetime object.
+    """
+    dt = parser.parse(date_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # Default to UTC
+    return dt
+
+def parse_date_to_iso(date_str):
+    """
+    Parse a date string using dateutil's parser.
+    If the datetime is offset-naive, default to UTC.
+    Returns date in ISO format.
+    """
+    return parse_date_to_datetime(date_str).isoformat()
+
+def _strptime(date_str, date_format):
+    dt = datetime.strptime(date_str, date_format)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)  # Default to UTC
+    return dt.astimezone(timezone.utc)
+
+def parse_date_string(date_str, format_cache=None):
+    """
+    Parse a feed date string, trying the strict formats before dateutil.
+    The result is always in UTC, like the feedparser time tuples, so dates
+    stored as ISO strings sort the same whichever parser produced them.
+    format_cache is a dict shared by the entries of one feed: the format
+    that matched last time is tried first, so a feed usually costs one
+    strptime per entry.
+    """
+    if format_cache is None:
+        format_cache = {}
+    date_str = date_str.strip()
+    cached_format = format_cache.get('format')
+    if cached_format:
+        try:
+            return _strptime(date_str, cached_format)
+        except ValueError:
+            pass
+    for date_format in STRICT_FORMATS:
+        if date_format == cached_format:
+            continue
+        try:
+            dt = _strptime(date_str, date_format)
+        except ValueError:
+            continue
+        format_cache['format'] = date_format
+        return dt
+    return parse_date_to_datetime(date_str).astimezone(timezone.utc)
+
+def parse_entry_date(entry, format_cache=None):
+    """
+    Return the publication date of a feed entry as an aware datetime, or
+    None when the entry has none.
+    Uses the UTC time tuple feedparser already computed when there is one,
+    then the strict formats, and dateutil only as a last resort.
+    """
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if parsed:
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
+    date_str = entry.get("published") or entry.get("updated")
+    if not date_str:
+        return None
+    return parse_date_string(date_str, format_cache)
@@ -0,0 +1,106 @@
+# feed_fetcher.py
+
+import logging
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from http_client import get_session
+
+# Constants
+MAX_WORKERS = 8  # Feeds downloaded at the same time
+MAX_PER_HOST = 2  # Feeds downloaded at the same time from a single host
+FEED_TIMEOUT = 30  # Seconds allowed for a whole feed download, connect included
+CHUNK_SIZE = 64 * 1024
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Result of a single feed download. content is None when the download failed
+# or when the server answered 304 Not Modified (not_modified is then True).
+FeedResult = namedtuple('FeedResult', ['blog', 'content', 'error', 'not_modified'])
+
+def fetch_feed(url, etag=None, last_modified=None, timeout=FEED_TIMEOUT):
+    """
+    Download a feed with a conditional GET.
+    The timeout covers the whole download, so a feed that trickles bytes
+    cannot hold up the run any longer than a feed that never answers.
+    Returns (content, etag, last_modified). content is None when the feed
+    has not changed since the validators were issued.
+    """
+    headers = dict(HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    deadline = time.monotonic() + timeout
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304:
+            return None, etag, last_modified
+        response.raise_for_status()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        chunks = []
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Feed download exceeded {timeout}s")
+            chunks.append(chunk)
+    return b''.join(chunks), etag, last_modified
+
+def fetch_feeds(blogs, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST, timeout=FEED_TIMEOUT):
+    """
+    Download the RSS feed of every blog concurrently.
+    At most max_workers downloads run at once, and at most max_per_host of
+    them against the same host: a host's next feed is only submitted when
+    one of its downloads finishes, so no worker waits on a busy host.
+    The ETag / Last-Modified validators stored on each blog entry are sent
+    back to the server and refreshed in place on a full download, so saving
+    the tracker afterwards persists them for the next run.
+    Returns a list of FeedResult in the same order as blogs.
+    """
+    def fetch(blog):
+        try:
+            content, etag, last_modified = fetch_feed(
+                blog["rss_url"], blog.get("etag"), blog.get("last_modified"), timeout=timeout)
+        except Exception as e:
+            logging.warning(f"Failed to fetch feed for {blog['blog_name']} ({blog['rss_url']}): {e}")
+            return FeedResult(blog, None, e, False)
+        if content is None:
+            return FeedResult(blog, None, None, True)
+        for key, value in (("etag", etag), ("last_modified", last_modified)):
+            if value:
+                blog[key] = value
+            else:
+                blog.pop(key, None)
+        return FeedResult(blog, content, None, False)
+
+    if not blogs:
+        return []
+    waiting = {}  # host -> deque of blog positions not submitted yet
+    for position, blog in enumerate(blogs):
+        waiting.setdefault(urlparse(blog["rss_url"]).netloc.lower(), deque()).append(position)
+
+    results = [None] * len(blogs)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(blogs))) as executor:
+        running = {}
+
+        def submit_next(host):
+            position = waiting[host].popleft()
+            running[executor.submit(fetch, blogs[position])] = (host, position)
+
+        # Hosts take turns in the first round so a long run of feeds from
+        # one host does not delay the others
+        for _ in range(max_per_host):
+            for host in waiting:
+                if waiting[host]:
+                    submit_next(host)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                host, position = running.pop(future)
+                results[position] = future.result()
+                if waiting[host]:
+                    submit_next(host)
+    return results
@@ -0,0 +1,93 @@
+# feed_stream.py
+
+from xml.etree.ElementTree import XMLPullParser
+
+# Constants
+CHUNK_SIZE = 16 * 1024  # Bytes handed to the pull parser at a time
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+# Namespaces of the feed formats themselves: RSS 2.0 (none), RSS 1.0, Atom 1.0 and 0.3.
+# Extension elements such as media:title or itunes:summary are not entry fields.
+FEED_NAMESPACES = ('', '{http://purl.org/rss/1.0/', '{http://www.w3.org/2005/Atom', '{http://purl.org/atom/ns#')
+ENTRY_TAGS = ('item', 'entry')  # RSS 0.9x/1.0/2.0 and Atom
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _feed_name(tag):
+    """
+    Return the local name of an RSS or Atom element, or None for elements
+    of any other namespace.
+    """
+    namespace, _, name = tag.rpartition('}')
+    return name if namespace in FEED_NAMESPACES else None
+
+def _text(element):
+    return (element.text or '').strip() if element is not None else ''
+
+def _entry_from_element(element):
+    """
+    Map an RSS <item> or Atom <entry> to a dict with the feedparser entry
+    keys the collector reads: id, link, title, description, published, updated.
+    """
+    entry = {}
+    content = ''
+    for child in element:
+        name = _feed_name(child.tag)
+        if name == 'title':
+            entry['title'] = _text(child)
+        elif name == 'link':
+            # Atom links live in href, only the alternate one points at the post
+            if child.get('href') is not None:
+                if child.get('rel', 'alternate') == 'alternate' and 'link' not in entry:
+                    entry['link'] = child.get('href')
+            else:
+                entry['link'] = _text(child)
+        elif name in ('guid', 'id'):
+            entry['id'] = _text(child)
+        elif name in ('description', 'summary'):
+            entry['description'] = _text(child)
+        elif child.tag == CONTENT_ENCODED or name == 'content':
+            content = _text(child)
+        elif name in ('pubDate', 'published', 'issued') or (child.tag == DC_DATE and 'published' not in entry):
+            entry['published'] = _text(child)
+        elif name in ('updated', 'modified'):
+            entry['updated'] = _text(child)
+    if 'description' not in entry and content:
+        entry['description'] = content
+    if 'published' not in entry and 'updated' in entry:
+        entry['published'] = entry['updated']
+    return entry
+
+def iter_feed_entries(content, chunk_size=CHUNK_SIZE):
+    """
+    Parse an RSS or Atom document incrementally and yield its entries one
+    at a time, in document order, as plain dicts.
+
+    The document is fed to an XMLPullParser in chunks and each entry
+    element is dropped from the tree once yielded, so a caller that stops
+    iterating early (for example at the feed watermark) never pays for the
+    rest of the document and memory does not grow with the entry count.
+    Raises xml.etree.ElementTree.ParseError on malformed XML.
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    parents = []
+
+    def entries_from_events():
+        for event, element in parser.read_events():
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            if _local_name(element.tag) in ENTRY_TAGS:
+                entry = _entry_from_element(element)
+                element.clear()
+                if parents:
+                    parents[-1].remove(element)
+                yield entry
+
+    for offset in range(0, len(content), chunk_size):
+        parser.feed(content[offset:offset + chunk_size])
+        yield from entries_from_events()
+    parser.close()
+    yield from entries_from_events()
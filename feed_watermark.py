@@ -0,0 +1,68 @@
+# feed_watermark.py
+
+from datetime import datetime
+
+from feed_dates import parse_entry_date
+
+def entry_guid(entry):
+    """
+    Return the GUID of a feed entry, falling back to its link.
+    """
+    return entry.get("id") or entry.get("link")
+
+def scan_new_entries(entries, watermark, last_fetched_date):
+    """
+    Yield (entry, published) for every entry newer than the blog's watermark.
+
+    The watermark is the {"published", "guid"} pair of the newest entry seen
+    on a previous run. Blogs without one fall back to the global last_fetched
+    date, compared by day, keeping that day's entries.
+    Feeds are normally newest first, so once two entry dates have shown
+    the feed going backwards in time the scan stops at the first old
+    entry. Until then, and for feeds that are oldest
+    first or not ordered at all, old entries are skipped and the feed is
+    walked to the end.
+    Each entry date is parsed once, with the strict format that matched
+    memoized for the rest of the feed.
+    """
+    watermark_date = datetime.fromisoformat(watermark["published"]) if watermark else None
+    watermark_guid = watermark.get("guid") if watermark else None
+
+    format_cache = {}
+    newest_first = None  # Unknown until two entry dates differ
+    previous = None
+    for entry in entries:
+        published = parse_entry_date(entry, format_cache)
+        if published is None:
+            continue  # Skip this entry and move to the next
+
+        if previous is not None and published != previous:
+            if published > previous:
+                newest_first = False
+            elif newest_first is None:
+                newest_first = True
+        previous = published
+
+        # Entries sharing the watermark's timestamp are only old when they
+        # are the watermark entry itself; repeats are dropped by the dedup
+        if watermark_date is None:
+            is_old = published.date() < last_fetched_date.date()
+        else:
+            is_old = published < watermark_date or (published == watermark_date and entry_guid(entry) == watermark_guid)
+        if is_old:
+            if newest_first:
+                break
+            continue
+        yield entry, published
+
+def advance_watermark(blog, entry, published):
+    """
+    Move the blog's watermark up to the given entry if it is newer.
+    """
+    watermark = blog.get("watermark")
+    if watermark and datetime.fromisoformat(watermark["published"]) >= published:
+        return
+    blog["watermark"] = {
+        "published": published.isoformat(),
+        "guid": entry_guid(entry)
+    }
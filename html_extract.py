@@ -0,0 +1,84 @@
+# html_extract.py
+
+import os
+import logging
+
+# Constants
+# Backend for extract_content: "bs" (BeautifulSoup, html.parser), "lxml" or "trafilatura"
+HTML_EXTRACT_BACKEND = os.environ.get('HTML_EXTRACT_BACKEND', 'bs')
+MIN_PARAGRAPH_WORDS = 6
+
+def keep_paragraph(text, title):
+    """
+    Keep paragraphs long enough to be article text that do not repeat the title.
+    """
+    return len(text.split()) >= MIN_PARAGRAPH_WORDS and (not title or title not in text)
+
+def extract_with_bs(html):
+    from bs4 import BeautifulSoup  # Imported here to keep startup fast
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove header and footer content
+    for element in soup.find_all(['header', 'footer']):
+        element.decompose()
+
+    title_tag = soup.find('title')
+    title = title_tag.get_text() if title_tag else ''
+
+    meta_description = ""
+    meta_tag = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
+    if meta_tag:
+        meta_description = meta_tag.attrs.get("content", "")
+
+    paragraphs = (p.get_text() for p in soup.find_all('p'))
+    content = [text for text in paragraphs if keep_paragraph(text, title)]
+    return '\n'.join(content), title, meta_description
+
+def extract_with_lxml(html):
+    from lxml import html as lxml_html  # Imported here to keep startup fast
+
+    tree = lxml_html.fromstring(html)
+
+    # Remove header and footer content
+    for element in tree.xpath('//header|//footer'):
+        element.drop_tree()
+
+    title = tree.findtext('.//title') or ''
+
+    meta_content = tree.xpath('//meta[@name="description"]/@content') or tree.xpath('//meta[@property="og:description"]/@content')
+    meta_description = meta_content[0] if meta_content else ""
+
+    paragraphs = (p.text_content() for p in tree.iter('p'))
+    content = [text for text in paragraphs if keep_paragraph(text, title)]
+    return '\n'.join(content), title, meta_description
+
+def extract_with_trafilatura(html):
+    import trafilatura  # Imported here to keep startup fast
+
+    text = trafilatura.extract(html, include_comments=False, include_tables=False) or ''
+    metadata = trafilatura.extract_metadata(html)
+    title = (metadata.title if metadata else None) or ''
+    meta_description = (metadata.description if metadata else None) or ''
+
+    content = [line for line in text.split('\n') if keep_paragraph(line, title)]
+    return '\n'.join(content), title, meta_description
+
+BACKENDS = {
+    "bs": extract_with_bs,
+    "lxml": extract_with_lxml,
+    "trafilatura": extract_with_trafilatura
+}
+
+def extract_content(html, backend=None):
+    """
+    Extract the main text, title and meta description of an article page.
+    Returns (content, title, meta_description), content being the kept
+    paragraphs joined by newlines.
+    """
+    backend = backend or HTML_EXTRACT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML extraction backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    content, title, meta_description = BACKENDS[backend](html)
+    logging.info(f"Extracted {len(content)} characters of content with {backend}.")
+    return content, title, meta_description
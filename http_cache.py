@@ -0,0 +1,128 @@
+# http_cache.py
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+
+from http_client import get_session
+from disk_cache import cache_size, write_atomic
+
+# Constants
+HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'dndblogs-http'))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+HTTP_CACHE_TTL = int(os.environ.get('HTTP_CACHE_TTL', 24 * 60 * 60))  # Seconds, when the server gives no max-age
+ENTRY_SUFFIX = '.cache'
+
+class CachedResponse(object):
+    """
+    The parts of a requests.Response the scrapers use, for a page served
+    from the cache or freshly fetched through it.
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+def _cache_control(headers):
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+def _max_age(directives):
+    if 'no-cache' in directives:
+        return 0  # Stored, but revalidated before every use
+    value = directives.get('max-age', '')
+    return int(value) if value.isdigit() else HTTP_CACHE_TTL
+
+def _entry_path(url, cache_dir):
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key[:2], key + ENTRY_SUFFIX)
+
+def _read_entry(path):
+    """
+    Return (meta, body) for a cache file, or None when it is missing or unreadable.
+    """
+    try:
+        with open(path, 'rb') as f:
+            meta = json.loads(f.readline())
+            body = zlib.decompress(f.read())
+    except (OSError, ValueError, zlib.error):
+        return None
+    return meta, body
+
+def _write_entry(path, meta, body):
+    """
+    Write a cache file and return by how many bytes it grew the cache.
+    """
+    try:
+        return write_atomic(path, json.dumps(meta).encode('utf-8') + b'\n' + zlib.compress(body))
+    except OSError as e:
+        logging.warning(f"Could not write HTTP cache entry for {meta['url']}: {e}")
+        return 0
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def cached_get(url, headers=None, limiter=None, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+    """
+    GET a page through the on-disk cache, revalidating stale entries.
+    limiter, a TokenBucket, is only acquired for requests that go out.
+    Returns a CachedResponse.
+    """
+    path = _entry_path(url, cache_dir)
+    entry = _read_entry(path)
+    request_headers = dict(headers or {})
+    if entry:
+        meta, body = entry
+        if time.time() < meta["stored_at"] + meta["max_age"]:
+            _touch(path)
+            return CachedResponse(url, meta["status_code"], meta["headers"], body, meta["encoding"], True)
+        if meta["headers"].get('ETag'):
+            request_headers['If-None-Match'] = meta["headers"]['ETag']
+        if meta["headers"].get('Last-Modified'):
+            request_headers['If-Modified-Since'] = meta["headers"]['Last-Modified']
+
+    if limiter is not None:
+        limiter.acquire()
+    response = get_session().get(url, headers=request_headers)
+    directives = _cache_control(response.headers)
+
+    if entry and response.status_code == 304:
+        # Still valid: keep the stored body, refresh its age and validators
+        for name in ('ETag', 'Last-Modified', 'Cache-Control'):
+            if name in response.headers:
+                meta["headers"][name] = response.headers[name]
+        meta["stored_at"] = time.time()
+        meta["max_age"] = _max_age(_cache_control(meta["headers"]))
+        cache_size(cache_dir, max_bytes, ENTRY_SUFFIX).add(_write_entry(path, meta, body))
+        return CachedResponse(url, meta["status_code"], meta["headers"], body, meta["encoding"], True)
+
+    if response.status_code == 200 and 'no-store' not in directives:
+        meta = {
+            "url": url,
+            "status_code": response.status_code,
+            "headers": {name: response.headers[name] for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Content-Type') if name in response.headers},
+            "encoding": response.encoding,
+            "stored_at": time.time(),
+            "max_age": _max_age(directives)
+        }
+        cache_size(cache_dir, max_bytes, ENTRY_SUFFIX).add(_write_entry(path, meta, response.content))
+
+    return CachedResponse(url, response.status_code, response.headers, response.content, response.encoding, False)
@@ -0,0 +1,132 @@
+# http_client.py
+
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Constants
+POOL_SIZE = 16  # Keep-alive connections kept per host
+DEFAULT_TIMEOUT = (5, 30)  # Seconds to connect, seconds between bytes
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # Seconds, doubled on every attempt
+BACKOFF_MAX = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuses that mean the server did not act on the request, so even a POST can be resent
+REJECTED_STATUSES = {429, 503}
+# Methods that are safe to resend after any failure. Gist PATCHes replace
+# whole file contents, so sending one twice has the same effect as once.
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'PATCH'}
+HOST_RATE = 2.0  # Requests per second allowed by host_bucket
+HOST_BURST = 4  # Requests host_bucket lets through back to back
+
+_session = None
+_session_lock = threading.Lock()
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Return the number of seconds to wait before retry number attempt (0 based).
+    Uses full jitter on an exponential cap, or the server's Retry-After when given.
+    """
+    if retry_after is not None:
+        return min(BACKOFF_MAX, retry_after)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _retry_after(response):
+    value = response.headers.get('Retry-After', '')
+    return float(value) if value.isdigit() else None
+
+class RetryingSession(requests.Session):
+    """
+    A requests session with a shared keep-alive connection pool, a default
+    timeout on every call and bounded retries with jittered backoff.
+    Idempotent methods are retried on connection errors, timeouts and
+    RETRY_STATUSES. Other methods (POST) are only retried when the request
+    never reached the server: a connect timeout or a REJECTED_STATUSES answer.
+    """
+
+    def __init__(self, max_retries=MAX_RETRIES, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+        super().__init__()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else REJECTED_STATUSES
+        attempt = 0
+        while True:
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logging.warning(f"{method} {url} failed ({e}), retrying in {delay:.1f}s...")
+            else:
+                if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                    return response
+                delay = backoff_delay(attempt, _retry_after(response))
+                logging.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s...")
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket: up to capacity calls go through at once,
+    after that acquire() paces callers to rate calls per second.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+def host_bucket(url, rate=HOST_RATE, capacity=HOST_BURST):
+    """
+    Return the process-wide token bucket of the host of url, creating it
+    with rate and capacity on first use, so every thread scraping the
+    same host shares one limit.
+    """
+    host = urlparse(url).netloc.lower()
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(rate, capacity)
+        return _buckets[host]
+
+def get_session():
+    """
+    Return the process-wide HTTP session.
+    Every gist, feed, Squabblr and scraping call goes through it, so a run
+    reuses one connection pool and gets the same timeouts and retries.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = RetryingSession()
+    return _session
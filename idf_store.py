@@ -0,0 +1,108 @@
+# idf_store.py
+#
+# Corpus-wide document frequencies for sentence scoring, kept in hashed
+# feature space so no vocabulary has to be built or stored.
+#
+#   python idf_store.py [community ...]   # add newly collected articles
+
+import os
+import sys
+import logging
+
+import numpy as np
+
+from article_store import article_id, load_manifest, load_shard, fetch_gist_file
+from communities import COMMUNITIES
+
+# Constants
+IDF_STORE_PATH = os.environ.get('IDF_STORE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'dndblogs-idf.npz'))
+N_FEATURES = 2 ** 18
+NGRAM_RANGE = (1, 2)
+MIN_DF = 2  # Terms found in fewer articles get no weight
+MAX_DF = 0.9  # Nor do terms found in more than this share of them
+
+def hashing_vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer  # Imported here to keep startup fast
+    return HashingVectorizer(n_features=N_FEATURES, stop_words='english', ngram_range=NGRAM_RANGE,
+                             alternate_sign=False, norm=None)
+
+def empty_store():
+    return {"df": np.zeros(N_FEATURES, dtype=np.int32), "n_docs": 0, "seen": set()}
+
+def load_store(path=IDF_STORE_PATH):
+    """
+    Load the document-frequency store, or return an empty one if there is none yet.
+    """
+    if not os.path.exists(path):
+        return empty_store()
+    with np.load(path) as data:
+        return {"df": data["df"], "n_docs": int(data["n_docs"]), "seen": set(data["seen"].tolist())}
+
+def save_store(store, path=IDF_STORE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp_path, df=store["df"], n_docs=store["n_docs"], seen=np.array(sorted(store["seen"]), dtype=str))
+    os.replace(tmp_path, path)
+
+def document_frequencies(matrix):
+    """
+    Count, for every hashed feature, the rows of a sparse matrix it occurs in.
+    """
+    matrix = matrix.tocsr()
+    matrix.sum_duplicates()
+    return np.bincount(matrix.indices, minlength=N_FEATURES).astype(np.int32)
+
+def add_documents(store, documents):
+    """
+    Add documents, given as (key, text) pairs, to the store. Keys already
+    in the store are skipped so re-running over the same articles does
+    not count them twice. Returns the number of documents added.
+    """
+    new = [(key, text) for key, text in documents if key not in store["seen"]]
+    if not new:
+        return 0
+    matrix = hashing_vectorizer().transform([text for _, text in new])
+    store["df"] = store["df"] + document_frequencies(matrix)
+    store["n_docs"] += len(new)
+    store["seen"].update(key for key, _ in new)
+    return len(new)
+
+def idf_weights(df, n_docs, min_df=MIN_DF, max_df=MAX_DF):
+    """
+    Smoothed IDF per hashed feature, as TfidfVectorizer computes it, with
+    features outside [min_df, max_df * n_docs] weighted 0.
+    """
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    idf[(df < min_df) | (df > max_df * n_docs)] = 0
+    return idf
+
+def article_text(article):
+    return f"{article.get('title', '')}\n{article.get('description', '')}"
+
+def update_from_community(store, community):
+    """
+    Add every article of a community's details shards and archives that
+    the store has not seen yet. Returns the number of articles added.
+    """
+    gist_id = community["details_gist_id"]
+    manifest = load_manifest(gist_id, community["gist_token"], community["details_file"])
+    added = 0
+    for shard in sorted(manifest["shards"]):
+        added += add_documents(store, ((article_id(article), article_text(article)) for article in load_shard(gist_id, shard)))
+    for archive in sorted(manifest.get("archives", {})):
+        added += add_documents(store, ((article_id(article), article_text(article)) for article in fetch_gist_file(gist_id, archive, default=[])))
+    return added
+
+def main(argv):
+    names = argv or ["dnd"]
+    store = load_store()
+    for name in names:
+        added = update_from_community(store, COMMUNITIES[name])
+        logging.info(f"Added {added} {name} articles to the IDF store.")
+    save_store(store)
+    logging.info(f"IDF store saved with {store['n_docs']} articles.")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
@@ -1,21 +1,48 @@
 # politics_rss_collection.py
 
 from xml.etree import ElementTree
-import requests
 from bs4 import BeautifulSoup
-import json
+import io
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urlunparse
 from datetime import datetime
+from article_store import add_articles, compact_shards
+from bill_cache import BillCache
+from http_client import get_session, host_bucket
+from http_cache import cached_get
 
 # Constants
 GIST_TOKEN = os.environ.get('POL_GIST_TOKEN')
 GIST_ID_DETAILS = '6c90a5d9642610efdbf83840dfc0fb76'
 FILE_NAME_DETAILS = 'politics-article-details.json'
-
-def get_rss_feed(url):
-    response = requests.get(url)
-    return response.text
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))  # Same setting as blog_collector.py
+RSS_URLS = [
+    ('https://www.govtrack.us/events/events.rss?list_id=2xtKwzEbrPGqdftV', 'Activity'),
+    # ('https://www.govtrack.us/events/events.rss?list_id=bIEEeNizAdvQ12hc', 'Votes'),
+    ('https://www.govtrack.us/events/events.rss?list_id=jjfjQNLQe3meewpG', 'New')
+]
+ENRICH_WORKERS = 8  # Items scraped at the same time
+GOVTRACK_RATE = float(os.environ.get('GOVTRACK_RATE', 2))  # Requests per second to govtrack.us
+GOVTRACK_BURST = 4
+
+def iter_feed_items(rss_urls=RSS_URLS):
+    """
+    Stream every feed in rss_urls and yield its parsed items one by one.
+    Each feed is parsed while it downloads, so items reach the enrichment
+    stage before the whole feed has arrived. A feed that fails to download
+    or parse is logged and skipped; items it yielded before failing are kept.
+    """
+    for url, feed_type in rss_urls:
+        try:
+            with get_session().get(url, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True  # Undo gzip while streaming
+                for item in fetch_rss_items(response.raw):
+                    yield parse_rss_item(item, feed_type)
+        except Exception as e:
+            logging.warning(f"Failed to read {feed_type} feed {url}: {e}")
 
 def parse_votes_description(description):
     """
@@ -38,33 +65,38 @@ def parse_activity_description(description):
         next_step = parts[1].split("Explanation:")[1].strip()
     return last_action, next_step
 
+def clean_bill_url(link):
+    """
+    Return a govtrack link without its query string and fragment.
+    """
+    parsed_url = urlparse(link)
+    return urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
+
 def parse_rss_item(item, feed_type):
-    title = item.find('title').text
-    link = item.find('link').text
-    description = item.find('description').text
+    title = item['title']
+    link = item['link']
+    description = item['description']
 
     # Extract and convert pubDate
-    pub_date_str = item.find('pubDate').text
+    pub_date_str = item['pubDate']
     pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
     
     # Parse the URL to remove the query parameters
-    parsed_url = urlparse(link)
-    clean_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
+    clean_url = clean_bill_url(link)
     
     # For bill_text, append /text to the clean URL
     bill_text = clean_url + '/text'
 
-    # Scrape additional info based on the link and feed type
-    bill_overview, bill_summary = scrape_additional_info(link, feed_type)
-
-    # Initialize the article details dictionary
+    # Initialize the article details dictionary. bill_overview and
+    # bill_summary are scraped afterwards by enrich_items.
     article_details = {
         'bill_title': title,
         'bill_link': link,
+        'guid': item.get('guid') or link,  # One per event, bill_link is shared by every event on a bill
         'bill_description': description,
-        'bill_overview': bill_overview,
+        'bill_overview': '',
         'bill_text': bill_text,
-        'bill_summary': bill_summary,
+        'bill_summary': '',
         'pub_date': pub_date.strftime('%Y-%m-%d %H:%M:%S'),  # Formatting date for JSON serialization
         'posted': False,
         'type': feed_type
@@ -84,177 +116,139 @@ def parse_rss_item(item, feed_type):
 
     return article_details
 
-def process_all_rss_items(rss_items, feed_type):
-    all_items = [parse_rss_item(item, feed_type) for item in rss_items]
-    return all_items
-
-# In your main script or main function
-all_items_from_all_feeds = []
-
-# Loop through all RSS feeds and aggregate all items
-for feed_url, feed_type in rss_urls:
-    
-    # Simulate fetching the RSS feed content
-    rss_feed_content = simulate_fetch_rss(feed_url)
-    # Parse the RSS feed items
-    rss_items = fetch_rss_items(rss_feed_content)
-    
-def simulate_fetch_rss(feed_url):
-    xml_file_map = {
-        'https://www.govtrack.us/events/events.rss?list_id=2xtKwzEbrPGqdftV': 'usgovtracker_rssfeed_activity.xml',
-        'https://www.govtrack.us/events/events.rss?list_id=bIEEeNizAdvQ12hc': 'usgovtracker_rssfeed_votes.xml',
-        'https://www.govtrack.us/events/events.rss?list_id=jjfjQNLQe3meewpG': 'usgovtracker_rssfeed_new.xml'
-    }
-    # Assuming the script runs in the same directory as the XML files
-    xml_file_path = xml_file_map[feed_url]
-    with open(xml_file_path, 'r') as file:
-        return file.read()
-
-rss_items = fetch_rss_items(simulate_fetch_rss(feed_url))
-  # Assume you have a function that fetches and returns all items from an RSS feed
-    all_items = process_all_rss_items(rss_items, feed_type)
-    all_items_from_all_feeds.extend(all_items)
-
-# Sort all items based on pub_date
-sorted_items = sorted(all_items_from_all_feeds, key=lambda x: x['pub_date'], reverse=True)
-
-# Convert datetime back to string for JSON serialization
-for item in sorted_items:
-    item['pub_date'] = item['pub_date'].strftime('%a, %d %b %Y %H:%M:%S %z')
+def govtrack_get(url):
+    """
+    GET a govtrack page through the page cache, paced by the govtrack token bucket.
+    """
+    return cached_get(url, limiter=host_bucket(url, GOVTRACK_RATE, GOVTRACK_BURST))
 
-for item in sorted_items:
-    item['pub_date'] = item['pub_date'].strftime('%a, %d %b %Y %H:%M:%S %z')
-    
 def scrape_additional_info(link, feed_type):
-    parsed_url = urlparse(link)
-    clean_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
+    clean_url = clean_bill_url(link)
     
-    response = requests.get(link)
+    response = govtrack_get(link)
     soup = BeautifulSoup(response.text, 'html.parser')
     content_div = soup.find(id='content')
-    bill_overview = content_div.find(lambda tag: tag.name == 'p' and tag.parent == content_div)
+    bill_overview = content_div.find(lambda tag: tag.name == 'p' and tag.parent == content_div) if content_div else None
     bill_overview = bill_overview.text if bill_overview else ''
     bill_summary = ''
     if feed_type == 'Activity':
         summary_link = clean_url + '/summary'
-        summary_response = requests.get(summary_link)
+        summary_response = govtrack_get(summary_link)
         summary_soup = BeautifulSoup(summary_response.text, 'html.parser')
         summary_div = summary_soup.find(id='libraryofcongress')
         
         if summary_div:
             bill_summary = " ".join([p.text for p in summary_div.find_all('p')])  # Concatenating all paragraphs
         else:
-            print(f"Warning: Missing or malformed summary for {link}. Proceeding with empty summary.")
+            logging.warning(f"Missing or malformed summary for {link}. Proceeding with empty summary.")
             bill_summary = ''
     elif feed_type == 'Votes':
         vote_explainer_div = soup.find(id='vote_explainer')
-        vote_explainer_link = "https://www.govtrack.us" + vote_explainer_div.a['href'] if vote_explainer_div and vote_explainer_div.a else ''
         if vote_explainer_div and vote_explainer_div.a and 'href' in vote_explainer_div.a.attrs:
             vote_explainer_link = "https://www.govtrack.us" + vote_explainer_div.a['href']
+            explainer_response = govtrack_get(vote_explainer_link)
+            explainer_soup = BeautifulSoup(explainer_response.text, 'html.parser')
+            content_div = explainer_soup.find(id='content')
+            overview_p = content_div.find('p') if content_div else None
+            bill_overview = overview_p.text if overview_p else ''
         else:
-            print(f"Warning: Missing or malformed vote explainer link for {link}. Proceeding with empty explainer link.")
-            vote_explainer_link = ''
-            
-        explainer_response = requests.get(vote_explainer_link)
-        explainer_soup = BeautifulSoup(explainer_response.text, 'html.parser')
-        content_div = explainer_soup.find(id='content')
-        bill_overview = content_div.find('p').text if content_div else ''
-        bill_text_link = vote_explainer_link.replace('?utm_campaign=govtrack_feed&amp;utm_source=govtrack/feed&amp;utm_medium=rss', '/text')
+            logging.warning(f"Missing or malformed vote explainer link for {link}. Proceeding with the bill page overview.")
     return bill_overview, bill_summary  # Removed bill_text_link
 
-import requests
-
-def write_to_json(data, file_name):
+def bill_cache_key(link, feed_type):
     """
-    Write the given data to a Gist file.
-
-    Parameters:
-    data (dict): The data to write to the file.
-    file_name (str): The name of the file to write to.
-
-    Returns:
-    None
+    Return the bill cache key of an item. Votes items take their overview
+    from the vote explainer rather than the bill page, so they are cached
+    under their own key.
     """
-    
-    headers = {
-        "Authorization": f"token {GIST_TOKEN}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    
-    payload = {
-        "files": {
-            file_name: {
-                "content": json.dumps(data, indent=4, ensure_ascii=False)
-            }
-        }
-    }
-    
-    response = requests.patch(f"https://api.github.com/gists/{GIST_ID_DETAILS}", headers=headers, json=payload)
-    
-    if response.status_code == 200:
-        print(f"Successfully updated {file_name} in gist {GIST_ID_DETAILS}")
-    else:
-        print(f"Failed to update gist. Status code: {response.status_code}, Response: {response.text}")
-
-
+    key = clean_bill_url(link)
+    return key + '#vote_explainer' if feed_type == 'Votes' else key
 
-def fetch_rss_items(xml_content):
+def enrich_items(items, bill_cache=None, max_workers=ENRICH_WORKERS):
     """
-    Parses the XML content of an RSS feed and extracts the items.
-    
-    :param xml_content: The XML content of the RSS feed as a string.
-    :return: A list of parsed items from the RSS feed.
+    Fill in bill_overview and bill_summary for every parsed item concurrently.
+    items can be a generator: each item is handed to a worker as soon as
+    it is produced, so scraping overlaps with feed parsing.
+    Bills already in bill_cache and still fresh are not scraped again, and
+    items sharing a bill share one scrape. Up to max_workers items are
+    handled at once, while the govtrack token bucket keeps the request
+    rate polite whatever the worker count.
+    Items whose pages fail to load keep empty fields.
+    Returns the list of items, in input order.
     """
-    # Parse the XML content
-    root = ElementTree.fromstring(xml_content)
-    
-    # Find all item elements
-    items = root.findall('.//item')
+    if bill_cache is None:
+        bill_cache = BillCache()
+
+    def enrich(item):
+        link, feed_type = item['bill_link'], item['type']
+        needs_summary = feed_type == 'Activity'  # Only Activity items carry the bill summary
+        try:
+            entry = bill_cache.get(bill_cache_key(link, feed_type), needs_summary, lambda: scrape_additional_info(link, feed_type))
+        except Exception as e:
+            logging.warning(f"Failed to scrape {link}: {e}")
+            return False
+        item['bill_overview'] = entry['bill_overview']
+        item['bill_summary'] = entry['bill_summary'] if needs_summary else ''
+        return True
+
+    enriched_items = []
+    enriched = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(item, executor.submit(enrich, item)) for item in items]
+        for item, future in futures:
+            enriched_items.append(item)
+            enriched += future.result()
+    logging.info(f"Bill details found for {enriched} of {len(enriched_items)} items.")
+    return enriched_items
+
+def fetch_rss_items(xml_source):
+    """
+    Parses an RSS feed incrementally and yields its items as they are read.
+    Each <item> is cleared and detached once yielded, so memory stays flat
+    however long the feed is.
     
-    # Parse each item and collect necessary details
-    rss_items = []
-    for item in items:
-        title = item.find('title').text
-        link = item.find('link').text
-        description = item.find('description').text
-        pub_date = item.find('pubDate').text
+    :param xml_source: The XML content of the RSS feed as a string or bytes, or a binary file object.
+    :return: A generator of dicts with the title, link, description, pubDate and guid of each item.
+    """
+    if isinstance(xml_source, str):
+        xml_source = xml_source.encode('utf-8')
+    if isinstance(xml_source, bytes):
+        xml_source = io.BytesIO(xml_source)
+
+    parents = []
+    for event, element in ElementTree.iterparse(xml_source, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag != 'item':
+            continue
 
         # Create a dictionary for each item
         rss_item = {
-            'title': title,
-            'link': link,
-            'description': description,
-            'pubDate': pub_date
+            'title': element.findtext('title'),
+            'link': element.findtext('link'),
+            'description': element.findtext('description'),
+            'pubDate': element.findtext('pubDate'),
+            'guid': element.findtext('guid')
         }
-        rss_items.append(rss_item)
-    
-    return rss_items
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+        yield rss_item
 
 def main():
-    def simulate_fetch_rss(feed_url):
-    xml_file_map = {
-    'https://www.govtrack.us/events/events.rss?list_id=2xtKwzEbrPGqdftV': 'usgovtracker_rssfeed_activity.xml',
-    'https://www.govtrack.us/events/events.rss?list_id=bIEEeNizAdvQ12hc': 'usgovtracker_rssfeed_votes.xml',
-    'https://www.govtrack.us/events/events.rss?list_id=jjfjQNLQe3meewpG': 'usgovtracker_rssfeed_new.xml'
-    }
-    # Assuming the script runs in the same directory as the XML files
-    xml_file_path = xml_file_map[feed_url]
-    with open(xml_file_path, 'r') as file:
-    return file.read()
+    logging.info("Parsing feeds and scraping bill details...")
+    bill_cache = BillCache.load(GIST_ID_DETAILS)
+    all_items = enrich_items(iter_feed_items(), bill_cache)
+    bill_cache.save(GIST_ID_DETAILS, GIST_TOKEN)
+    added = add_articles(GIST_ID_DETAILS, GIST_TOKEN, FILE_NAME_DETAILS, all_items)
+    logging.info(f"Added {len(added)} new items to {FILE_NAME_DETAILS}.")
 
-    rss_items = fetch_rss_items(simulate_fetch_rss(feed_url))
-    # URLs of the RSS feeds
-    rss_urls = [
-        ('https://www.govtrack.us/events/events.rss?list_id=2xtKwzEbrPGqdftV', 'Activity'),
-        # ('https://www.govtrack.us/events/events.rss?list_id=bIEEeNizAdvQ12hc', 'Votes'),
-        ('https://www.govtrack.us/events/events.rss?list_id=jjfjQNLQe3meewpG', 'New')
-    ]
-    all_items = []
-    for url, feed_type in rss_urls:
-        rss_content = get_rss_feed(url)
-        items = parse_rss(rss_content, feed_type)
-        all_items.extend(items)
-    write_to_json(all_items, FILE_NAME_DETAILS)
+    # Move old posted items out of the hot shards
+    archived_count = compact_shards(GIST_ID_DETAILS, GIST_TOKEN, FILE_NAME_DETAILS, ARCHIVE_AFTER_DAYS)
+    logging.info(f"Compaction completed. {archived_count} items archived.")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
@@ -0,0 +1,29 @@
+# squabblr.py
+
+import logging
+
+from http_client import get_session
+
+# Constants
+SQUABBLR_POST_URL = 'https://squabblr.co/api/new-post'
+
+def post_to_squabblr(community_name, token, title, content):
+    """
+    Create a new post in a Squabblr community.
+    Raises when Squabblr reports an error, so the article is not marked as posted.
+    """
+    logging.info(f"Posting article '{title}' to Squabblr.co/s/{community_name}...")
+    headers = {
+        'authorization': 'Bearer ' + token
+    }
+    response = get_session().post(SQUABBLR_POST_URL, data={
+        "community_name": community_name,
+        "title": title,
+        "content": content
+    }, headers=headers)
+    post_response = response.json()
+    if 'error' in post_response:
+        logging.error(f"Error posting article: {post_response['error']}")
+        raise RuntimeError(post_response['error'])
+    logging.info(f"Article '{title}' posted successfully.")
+    return post_response
@@ -0,0 +1,52 @@
+# summary_cache.py
+
+import os
+import json
+import hashlib
+import logging
+
+from disk_cache import cache_size, write_atomic
+
+# Constants
+SUMMARY_CACHE_DIR = os.environ.get('SUMMARY_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'dndblogs-summaries'))
+SUMMARY_CACHE_MAX_BYTES = int(os.environ.get('SUMMARY_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
+def cache_key(kind, text, params):
+    """
+    Return the cache key for a result of the given kind ("summary",
+    "main_points", ...) computed from text with params. params holds
+    everything that changes the result, such as the model name and the
+    generation settings, so changing any of them misses the old entries.
+    """
+    header = json.dumps([kind, params], sort_keys=True)
+    return hashlib.sha256((header + '\n' + text).encode('utf-8')).hexdigest()
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, key[:2], key + '.json')
+
+def get_cached(key, cache_dir=SUMMARY_CACHE_DIR):
+    """
+    Return the cached value for key, or None on a miss.
+    A hit refreshes the entry's mtime, which is what eviction goes by.
+    """
+    path = _entry_path(key, cache_dir)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            value = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return value
+
+def set_cached(key, value, cache_dir=SUMMARY_CACHE_DIR, max_bytes=SUMMARY_CACHE_MAX_BYTES):
+    """
+    Store a JSON-serializable value under key, then evict the least
+    recently used entries if the cache grew past max_bytes.
+    Failures are logged and otherwise ignored, the cache is only a shortcut.
+    """
+    try:
+        grown = write_atomic(_entry_path(key, cache_dir), json.dumps(value).encode('utf-8'))
+    except OSError as e:
+        logging.warning(f"Could not write summary cache entry {key}: {e}")
+        return
+    cache_size(cache_dir, max_bytes, '.json').add(grown)
@@ -0,0 +1,32 @@
+# text_normalize.py
+
+import html
+import re
+
+# A negated class instead of the old lazy '<[^<]+?>' keeps tag stripping
+# linear on large content:encoded bodies.
+TAG_RE = re.compile(r'<[^<>]+>')
+
+def normalize_text(text):
+    """
+    Strip HTML tags, decode HTML entities and collapse whitespace.
+    Tags are removed without leaving a space, like the old regex did.
+    Every whitespace run, newlines and decoded &nbsp; included, becomes a
+    single space, and the result has no leading or trailing spaces.
+
+    Each step is a single C-level pass and the entity pass is skipped when
+    there is nothing to decode. A pure-Python single pass over the text
+    measured slower than this (see benchmarks/bench_text_normalize.py).
+    """
+    text = TAG_RE.sub('', text)  # Remove HTML tags
+    if '&' in text:
+        text = html.unescape(text)  # Convert HTML entities to their respective characters
+        if '&nbsp;' in text:
+            text = text.replace('&nbsp;', ' ')  # Double-escaped non-breaking spaces
+    return ' '.join(text.split())  # Collapse whitespace runs and trim
+
+def collapse_whitespace(text):
+    """
+    Collapse every whitespace run, newlines included, into one space.
+    """
+    return ' '.join(text.split())